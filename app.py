@@ -1,8 +1,21 @@
-from flask import Flask, request, render_template, jsonify
+from flask import Flask, Response, request, render_template, jsonify, stream_with_context
 import os
-from transformers import pipeline
+import json
 from dotenv import load_dotenv
 import importlib.metadata
+import time
+import httpx
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, wait
+
+import metrics
+import profiler
+from batching import SentimentBatcher
+from bulk import RateLimiter, batched, iter_lines, ndjson_line, parse_entries
+from circuit_breaker import CallReport, CircuitBreaker, CircuitOpenError, DeadlineExceededError, QueueTimeoutError
+from fallback import build_fallback_response
+from process_stats import memory_usage
+from result_cache import ResultCache, cache_key, normalize_entry
+from sentiment_backend import DEFAULT_BUCKETS, load_sentiment_analyzer
 
 # Load environment variables from .env file
 load_dotenv()
@@ -12,76 +25,200 @@ app = Flask(__name__)
 # Initialize sentiment analysis pipeline with the multilingual model
 # Get Hugging Face API key from .env file
 hf_api_key = os.getenv("HF_API_KEY")
-sentiment_analyzer = pipeline("text-classification", 
-                             model="tabularisai/multilingual-sentiment-analysis", 
-                             token=hf_api_key)
+# A Hugging Face model id or a local directory (e.g. the benchmarks' tiny model)
+SENTIMENT_MODEL = os.getenv("SENTIMENT_MODEL", "tabularisai/multilingual-sentiment-analysis")
+# "pytorch" (fp32 pipeline), "int8" (dynamically quantized) or "onnx" (ONNX Runtime)
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "pytorch")
+# With gunicorn's preload_app this runs once in the master and the weights are
+# shared copy-on-write by every forked worker
+loaded_in_pid = os.getpid()
+model_load_started = time.perf_counter()
+sentiment_analyzer = load_sentiment_analyzer(
+    SENTIMENT_MODEL,
+    SENTIMENT_BACKEND,
+    token=hf_api_key,
+    threads=int(os.getenv("SENTIMENT_THREADS", "0")) or None,
+    buckets=[int(n) for n in os.getenv("SENTIMENT_PAD_BUCKETS", ",".join(map(str, DEFAULT_BUCKETS))).split(",")],
+    onnx_path=os.getenv("SENTIMENT_ONNX_PATH") or None
+)
+model_load_seconds = time.perf_counter() - model_load_started
+print(f"Sentiment model ({SENTIMENT_BACKEND}) loaded in {model_load_seconds:.2f}s (pid {loaded_in_pid})")
+
+# Concurrent /submit calls are grouped into one padded forward pass instead of
+# running a batch-of-one per request
+sentiment_batcher = SentimentBatcher(
+    sentiment_analyzer,
+    max_batch_size=int(os.getenv("SENTIMENT_MAX_BATCH_SIZE", "16")),
+    max_wait_ms=float(os.getenv("SENTIMENT_MAX_WAIT_MS", "10")),
+)
 
 # Initialize Groq client - with better error handling for different versions
 groq_api_key = os.getenv("GROQ_API_KEY")
-groq_client = None
+GROQ_MODEL = "mixtral-8x7b-32768"
 
 # Get the installed version of groq
 groq_version = importlib.metadata.version('groq')
 print(f"Using groq version: {groq_version}")
 
-try:
-    # Try the standard import
-    from groq import Groq
-    groq_client = Groq(api_key=groq_api_key)
-except TypeError as e:
-    if 'proxies' in str(e):
-        # The error is related to the 'proxies' keyword
-        print("Detected proxies issue, using alternative initialization method")
+def create_groq_client():
+    try:
+        # Try the standard import
+        from groq import Groq
+        return Groq(api_key=groq_api_key)
+    except TypeError as e:
+        if 'proxies' in str(e):
+            # The error is related to the 'proxies' keyword
+            print("Detected proxies issue, using alternative initialization method")
+            try:
+                # Try to import with environment variable
+                os.environ["GROQ_API_KEY"] = groq_api_key
+                from groq import Groq
+                return Groq()
+            except Exception as alt_e:
+                print(f"Alternative initialization failed: {alt_e}")
+                # Final fallback - try to use the client directly
+                from groq.client import Groq as OldGroq
+                return OldGroq(api_key=groq_api_key)
+    except Exception as e:
+        print(f"Unexpected error initializing Groq client: {e}")
+        # If everything else fails, use an older import pattern
         try:
-            # Try to import with environment variable
-            os.environ["GROQ_API_KEY"] = groq_api_key
-            from groq import Groq
-            groq_client = Groq()
-        except Exception as alt_e:
-            print(f"Alternative initialization failed: {alt_e}")
-            # Final fallback - try to use the client directly
             from groq.client import Groq as OldGroq
-            groq_client = OldGroq(api_key=groq_api_key)
-except Exception as e:
-    print(f"Unexpected error initializing Groq client: {e}")
-    # If everything else fails, use an older import pattern
-    try:
-        from groq.client import Groq as OldGroq
-        groq_client = OldGroq(api_key=groq_api_key)
-    except Exception as final_e:
-        print(f"FATAL: Could not initialize Groq client: {final_e}")
+            return OldGroq(api_key=groq_api_key)
+        except Exception as final_e:
+            print(f"FATAL: Could not initialize Groq client: {final_e}")
+    return None
+
+# gunicorn.conf.py calls create_groq_client() again in each forked worker so
+# workers never share the master's HTTP connection pool
+groq_client = create_groq_client()
+
+# While Groq is failing or slow the breaker opens and requests get the fallback
+# response straight away instead of each waiting for the call to fail.
+# Breakers are per worker process.
+groq_breaker = CircuitBreaker(
+    failure_rate=float(os.getenv("GROQ_BREAKER_FAILURE_RATE", "0.5")),
+    min_calls=int(os.getenv("GROQ_BREAKER_MIN_CALLS", "5")),
+    window_seconds=float(os.getenv("GROQ_BREAKER_WINDOW_SECONDS", "60")),
+    slow_call_seconds=float(os.getenv("GROQ_BREAKER_SLOW_CALL_SECONDS", "30")),
+    open_seconds=float(os.getenv("GROQ_BREAKER_OPEN_SECONDS", "30"))
+)
+
+# Hedge: serve the fallback if Groq hasn't answered (or sent its first streamed
+# token) within this many seconds. 0 waits for the call however long it takes.
+GROQ_DEADLINE_SECONDS = float(os.getenv("GROQ_DEADLINE_SECONDS", "0"))
+# Limits on each Groq call attempt, shared with asgi.py. The client's defaults
+# (60s and two retries) let a hung Groq hold a request for minutes before the
+# breaker hears about it.
+GROQ_TIMEOUT_SECONDS = float(os.getenv("GROQ_TIMEOUT_SECONDS", "60"))
+GROQ_CONNECT_TIMEOUT_SECONDS = float(os.getenv("GROQ_CONNECT_TIMEOUT_SECONDS", "5"))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "1"))
+# Hedged calls run here so a request can stop waiting while the call finishes
+groq_executor = ThreadPoolExecutor(max_workers=int(os.getenv("GROQ_MAX_CONCURRENCY", "64")),
+                                   thread_name_prefix="groq")
+
+# Sentiment results and Groq responses, keyed by a hash of the normalized entry
+# plus the model and prompt version, so resubmits and retries don't redo the
+# work. Set RESULT_CACHE_PATH to add an SQLite tier shared by all workers.
+result_cache = ResultCache(
+    max_entries=int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "1024")),
+    ttl_seconds=float(os.getenv("RESULT_CACHE_TTL_SECONDS", "86400")),
+    path=os.getenv("RESULT_CACHE_PATH") or None
+)
+
+# /submit/bulk: entries per sentiment forward pass, Groq calls in flight per
+# upload, and Groq calls per second shared by all uploads in this worker
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "64"))
+BULK_LLM_CONCURRENCY = int(os.getenv("BULK_LLM_CONCURRENCY", "4"))
+BULK_MAX_LINE_BYTES = int(os.getenv("BULK_MAX_LINE_BYTES", str(1024 * 1024)))
+bulk_rate_limiter = RateLimiter(float(os.getenv("BULK_LLM_RATE_PER_SECOND", "5")))
+
+# Set by gunicorn.conf.py once a worker is ready to serve (None under `python app.py`)
+worker_cold_start_seconds = None
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
-@app.route('/submit', methods=['POST'])
-def submit():
-    try:
-        data = request.json
-        journal_entry = data['entry']
-        
-        if not journal_entry.strip():
-            return jsonify({'success': False, 'error': 'Journal entry cannot be empty'})
-        
-        # Sentiment analysis using the multilingual model
-        sentiment_result = sentiment_analyzer(journal_entry)[0]
-        sentiment = sentiment_result['label']
-        score = sentiment_result['score']
-        
-        # Converting sentiment labels (may be different from previous model)
-        # The multilingual model returns "positive", "neutral", or "negative" as labels
-        mood_map = {
-            "positive": "positive",
-            "neutral": "neutral",
-            "negative": "negative"
+@app.route('/stats')
+def stats():
+    return jsonify({
+        'pid': os.getpid(),
+        'preloaded': os.getpid() != loaded_in_pid,
+        'sentiment_backend': SENTIMENT_BACKEND,
+        'model_load_seconds': round(model_load_seconds, 3),
+        'worker_cold_start_seconds': worker_cold_start_seconds,
+        'memory': memory_usage(),
+        'groq_breaker': groq_breaker.snapshot(),
+        'result_cache': result_cache.stats(),
+        'sentiment_batcher': {
+            'batches': sentiment_batcher.batches,
+            'items': sentiment_batcher.items
         }
-        
-        mood = mood_map.get(sentiment.lower(), sentiment.lower())
-        score_rounded = round(score * 100)
-        
-        # Groq API prompt
-        prompt = f"""
+    })
+
+def sentiment_cache_key(journal_entry):
+    return cache_key("sentiment", SENTIMENT_MODEL, SENTIMENT_BACKEND, normalize_entry(journal_entry))
+
+def response_cache_key(journal_entry):
+    return cache_key("response", SENTIMENT_MODEL, SENTIMENT_BACKEND, GROQ_MODEL, PROMPT_VERSION, normalize_entry(journal_entry))
+
+def analyze_sentiments(journal_entries):
+    # Bulk counterpart of analyze_sentiment(): the entries that aren't cached go
+    # through the pipeline as one large batch. Gives (sentiment, mood, score)
+    # or the exception raised for each entry.
+    keys = [sentiment_cache_key(entry) for entry in journal_entries]
+    results = [result_cache.get(key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        texts = [journal_entries[i] for i in missing]
+        try:
+            computed = sentiment_analyzer(texts, batch_size=len(texts))
+        except Exception:
+            # Retry one by one so a single bad entry doesn't fail the batch
+            computed = []
+            for text in texts:
+                try:
+                    computed.append(sentiment_analyzer([text])[0])
+                except Exception as e:
+                    computed.append(e)
+        for i, result in zip(missing, computed):
+            results[i] = result
+            if not isinstance(result, Exception):
+                result_cache.set(keys[i], result)
+    return [result if isinstance(result, Exception) else interpret_sentiment(result) for result in results]
+
+def analyze_sentiment(journal_entry):
+    # Sentiment analysis using the multilingual model
+    sentiment_result = result_cache.get_or_compute(
+        sentiment_cache_key(journal_entry), lambda: sentiment_batcher.analyze(journal_entry)
+    )
+    return interpret_sentiment(sentiment_result)
+
+def interpret_sentiment(sentiment_result):
+    sentiment = sentiment_result['label']
+    score = sentiment_result['score']
+    
+    # Converting sentiment labels (may be different from previous model)
+    # The multilingual model returns "positive", "neutral", or "negative" as labels
+    mood_map = {
+        "positive": "positive",
+        "neutral": "neutral",
+        "negative": "negative"
+    }
+    
+    mood = mood_map.get(sentiment.lower(), sentiment.lower())
+    score_rounded = round(score * 100)
+    
+    return sentiment, mood, score_rounded
+
+# Bump whenever build_prompt() changes so responses to the old prompt are not
+# served from the cache
+PROMPT_VERSION = "1"
+
+def build_prompt(journal_entry, sentiment, score_rounded):
+    # Groq API prompt
+    return f"""
         You are Lotus, an empathetic AI journal companion. Generate a detailed, warm, and deeply personalized response (approximately 400-500 words) to the user's journal entry below.
         
         The user's sentiment analysis shows: {sentiment} with {score_rounded}% confidence, but go beyond this simple classification.
@@ -105,175 +242,327 @@ def submit():
         
         Journal entry: "{journal_entry}"
         """
+
+def completion_args(prompt):
+    # Shared with the async client in asgi.py
+    return dict(
+        messages=[{"role": "user", "content": prompt}],
+        model=GROQ_MODEL,
+        temperature=1.0,
+        max_tokens=2000
+    )
+
+def limited_client(timeout=None, max_retries=None):
+    # groq_client with this app's timeouts and retries instead of the defaults
+    timeout = GROQ_TIMEOUT_SECONDS if timeout is None else timeout
+    return groq_client.with_options(
+        timeout=httpx.Timeout(timeout, connect=min(timeout, GROQ_CONNECT_TIMEOUT_SECONDS)),
+        max_retries=GROQ_MAX_RETRIES if max_retries is None else max_retries
+    )
+
+def create_completion(prompt, **kwargs):
+    return limited_client().chat.completions.create(**completion_args(prompt), **kwargs)
+
+def generate_response(prompt, cache_key=None, rate_limiter=None):
+    # Groq completion behind the result cache, circuit breaker and deadline.
+    # Raises when the caller should serve the fallback response instead.
+    if cache_key is not None:
+        return result_cache.get_or_compute(cache_key, lambda: _generate_response(prompt, cache_key, rate_limiter))
+    return _generate_response(prompt, None, rate_limiter)
+
+def _generate_response(prompt, cache_key, rate_limiter=None):
+    if not groq_breaker.allow_request():
+        raise CircuitOpenError("Groq circuit breaker is open")
+    if rate_limiter is not None:
+        # Only actual Groq calls wait; cache hits return before this
+        rate_limiter.acquire()
+    
+    report = CallReport(groq_breaker)
+    started_at = []
+    
+    def call():
+        started = time.perf_counter()
+        started_at.append(started)
+        try:
+            content = create_completion(prompt).choices[0].message.content
+        except Exception as e:
+            report.failure()
+            metrics.count_llm_error(e)
+            raise
+        report.success(time.perf_counter() - started)
+        if cache_key is not None:
+            # Also keeps the result of a call that finished after its deadline
+            result_cache.set(cache_key, content)
+        return content
+    
+    if not GROQ_DEADLINE_SECONDS:
+        return call()
+    future = groq_executor.submit(call)
+    try:
+        return future.result(timeout=GROQ_DEADLINE_SECONDS)
+    except FuturesTimeoutError:
+        pass
+    if future.cancel():
+        # Still queued behind other calls: it is dropped before it reaches a
+        # Groq that is already slow, and the wait is not Groq's fault
+        raise QueueTimeoutError(f"Groq call did not start within {GROQ_DEADLINE_SECONDS}s")
+    # The deadline applies to the call itself, not to its time in the queue
+    started = started_at[0] if started_at else time.perf_counter()
+    try:
+        return future.result(timeout=max(0, started + GROQ_DEADLINE_SECONDS - time.perf_counter()))
+    except FuturesTimeoutError:
+        # Counted as a bad call now; the call carries on (and may still fill
+        # the cache) but its outcome is no longer reported to the breaker
+        report.deadline_missed()
+        raise DeadlineExceededError(f"Groq did not respond within {GROQ_DEADLINE_SECONDS}s")
+
+def stream_response(prompt):
+    # Streaming counterpart of generate_response(): yields HTML chunks. With a
+    # deadline, waiting longer than that for any chunk (including the first)
+    # aborts the stream.
+    if not groq_breaker.allow_request():
+        raise CircuitOpenError("Groq circuit breaker is open")
+    
+    started = time.perf_counter()
+    first_token_seconds = None
+    try:
+        if GROQ_DEADLINE_SECONDS:
+            client = limited_client(timeout=GROQ_DEADLINE_SECONDS, max_retries=0)
+        else:
+            client = limited_client()
+        with client.chat.completions.create(**completion_args(prompt), stream=True) as stream:
+            for chunk in stream:
+                content = chunk.choices[0].delta.content
+                if content:
+                    if first_token_seconds is None:
+                        first_token_seconds = time.perf_counter() - started
+                    yield content
+    except Exception as e:
+        groq_breaker.record_failure()
+        metrics.count_llm_error(e)
+        raise
+    # Judge streams by time to first token; the total depends on response length
+    groq_breaker.record_success(first_token_seconds or time.perf_counter() - started)
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/metrics')
+def prometheus_metrics():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/debug/profile')
+def debug_profile():
+    # Opt-in: samples this worker's threads and returns collapsed stacks
+    if not profiler.PROFILER_ENABLED:
+        return jsonify({'success': False, 'error': 'Profiling is disabled (set PROFILER_ENABLED=1)'}), 404
+    seconds = request.args.get('seconds', 10, type=float)
+    interval_ms = request.args.get('interval_ms', profiler.PROFILER_INTERVAL_MS, type=float)
+    try:
+        stacks = profiler.sample_stacks(seconds, interval_ms)
+    except profiler.ProfilerBusyError as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
+    return Response(profiler.collapsed(stacks), mimetype='text/plain')
+
+@app.route('/submit', methods=['POST'])
+def submit():
+    timer = metrics.RequestTimer('/submit')
+    try:
+        data = request.json
+        journal_entry = data['entry']
+        
+        if not journal_entry.strip():
+            timer.finish('empty')
+            return jsonify({'success': False, 'error': 'Journal entry cannot be empty'})
+        timer.entry(journal_entry)
+        
+        with timer.stage('sentiment'):
+            sentiment, mood, score_rounded = analyze_sentiment(journal_entry)
+        with timer.stage('prompt'):
+            prompt = build_prompt(journal_entry, sentiment, score_rounded)
         
         try:
             # Call Groq API with fallback
-            response = groq_client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model="mixtral-8x7b-32768",
-                temperature=1.0,
-                max_tokens=2000
-            ).choices[0].message.content
+            with timer.stage('llm'):
+                response = generate_response(prompt, response_cache_key(journal_entry))
         except Exception as api_error:
-            # Create a more detailed fallback response
-            keywords = journal_entry.lower().split()
-            
-            # Set fallback_mood based on sentiment analysis result
-            fallback_mood = mood  # Using the already defined 'mood' variable
-            
-            # Extract potential emotional themes and specific details from journal
-            # More detailed keyword analysis
-            stress_words = any(word in journal_entry.lower() for word in ["stress", "anxiety", "worried", "overwhelmed", "pressure", "tense", "nervous", "panic"])
-            sadness_words = any(word in journal_entry.lower() for word in ["sad", "down", "depressed", "unhappy", "lonely", "miss", "grief", "loss", "hurt"])
-            happiness_words = any(word in journal_entry.lower() for word in ["happy", "joy", "excited", "grateful", "wonderful", "pleased", "delighted", "content"])
-            relationship_words = any(word in journal_entry.lower() for word in ["friend", "partner", "family", "relationship", "boyfriend", "girlfriend", "husband", "wife", "mom", "dad", "parent", "child"])
-            work_words = any(word in journal_entry.lower() for word in ["work", "job", "career", "boss", "project", "deadline", "colleague", "office", "meeting"])
-            sleep_words = any(word in journal_entry.lower() for word in ["sleep", "tired", "insomnia", "rest", "exhausted", "fatigue", "bed", "dream"])
-            health_words = any(word in journal_entry.lower() for word in ["health", "sick", "pain", "doctor", "illness", "symptom", "body", "physical"])
-            future_words = any(word in journal_entry.lower() for word in ["future", "plan", "goal", "dream", "aspiration", "hope", "worry about", "uncertain"])
-            
-            # Look for specific activities mentioned
-            exercise_mention = any(word in journal_entry.lower() for word in ["exercise", "workout", "run", "gym", "walk", "yoga", "fitness"])
-            meditation_mention = any(word in journal_entry.lower() for word in ["meditate", "meditation", "mindfulness", "breathe", "breathing", "calm"])
-            creative_mention = any(word in journal_entry.lower() for word in ["art", "write", "create", "music", "play", "paint", "draw", "sing", "creative"])
-            nature_mention = any(word in journal_entry.lower() for word in ["nature", "outside", "outdoors", "park", "garden", "hike", "trees", "plants"])
-            
-            # Detect specific emotions beyond positive/negative
-            frustration = any(word in journal_entry.lower() for word in ["frustrat", "annoy", "irritate", "upset", "bothered"])
-            hope = any(word in journal_entry.lower() for word in ["hope", "optimistic", "looking forward", "better", "improve"])
-            confusion = any(word in journal_entry.lower() for word in ["confus", "uncertain", "not sure", "don't know", "unclear", "lost"])
-            gratitude = any(word in journal_entry.lower() for word in ["grateful", "thankful", "appreciate", "blessed"])
-            
-            # Extract specific themes to personalize exercises
-            themes = []
-            if stress_words: themes.append("stress")
-            if sadness_words: themes.append("sadness")
-            if happiness_words: themes.append("happiness")
-            if relationship_words: themes.append("relationships")
-            if work_words: themes.append("work")
-            if sleep_words: themes.append("sleep")
-            if health_words: themes.append("health")
-            if future_words: themes.append("future planning")
-            
-            # Detect preferences/interests for personalization
-            interests = []
-            if exercise_mention: interests.append("physical activity")
-            if meditation_mention: interests.append("mindfulness")
-            if creative_mention: interests.append("creative expression")
-            if nature_mention: interests.append("nature")
-            
-            # Define personalized exercises based on combination of themes and interests
-            personalized_exercises = []
-            
-            # Work-related exercises
-            if "work" in themes:
-                if frustration:
-                    personalized_exercises.append("Try the 'Three Good Things at Work' exercise: At the end of each workday this week, write down three things that went well at work, no matter how small. For each positive event, note your role in it. This practice can help rebalance your perspective when work frustrations feel overwhelming.")
-                
-                if "stress" in themes:
-                    personalized_exercises.append("Practice the '90-second pause' technique when work stress arises: Set a timer for 90 seconds and focus only on your breathing while acknowledging the stress sensation in your body. Research shows most emotional reactions biochemically last about 90 seconds if we don't continue to feed them with thoughts. This gives you a reset button during challenging workdays.")
-                
-                personalized_exercises.append("Create a 'work containment ritual' to separate your professional and personal life. At the end of your workday, write down your top three priorities for tomorrow, then physically close your laptop or put away work materials while saying 'Work is complete for today.' This creates a psychological boundary that can prevent work stress from spilling into your personal time.")
-            
-            # Relationship-focused exercises
-            if "relationships" in themes:
-                if "sadness" in themes:
-                    personalized_exercises.append("Write a 'connection letter' (unsent) to the person you're missing or having challenges with. Express your feelings honestly without judgment, then ask yourself what core need is being revealed through these emotions. Often, relationship difficulties point to important values like security, recognition, or understanding.")
-                
-                personalized_exercises.append("Practice 'active listening plus' in your next important conversation: Give your full attention, avoid interrupting, and summarize what you've heard. Then add the 'plus' - ask one curious question that invites deeper sharing. This demonstrates genuine interest beyond just hearing words.")
-            
-            # Sleep and rest exercises
-            if "sleep" in themes:
-                personalized_exercises.append("Try the '4-7-8 breathing technique' before bed: Inhale quietly through your nose for 4 seconds, hold your breath for 7 seconds, then exhale completely through your mouth for 8 seconds. Repeat 4 times. This pattern helps activate your parasympathetic nervous system, countering the sleep-disrupting effects of stress.")
-                
-                personalized_exercises.append("Create a 'worry drop' ritual before sleep: Keep a dedicated notepad by your bed. When racing thoughts arise, write them down completely, then visualize physically placing them in a container until morning. Tell yourself, 'I've saved these thoughts and can address them tomorrow with a fresher mind.'")
-            
-            # Health-focused exercises
-            if "health" in themes:
-                personalized_exercises.append("Practice a 3-minute body appreciation scan: Starting at your feet and moving upward, acknowledge something each part of your body allows you to do, regardless of pain or limitation. This shifts focus from what's wrong to what's still working, which research shows can actually reduce perceived pain intensity.")
-                
-                if "stress" in themes:
-                    personalized_exercises.append("Try 'symptom scheduling' for health anxiety: Set aside 5-10 minutes twice daily to focus completely on physical sensations and health concerns. Outside these times, when health worries arise, gently remind yourself they'll be addressed during the next scheduled session. This prevents health concerns from constantly interrupting your day.")
-            
-            # Future planning exercises
-            if "future planning" in themes:
-                if confusion:
-                    personalized_exercises.append("Use the 'Values Compass' exercise: List 5-7 core values (like connection, growth, security, etc.) Then rate how satisfied you feel with each one currently (1-10) and identify one small action for your highest priority value. When feeling uncertain about the future, this reconnects you with what matters most.")
-                
-                if hope:
-                    personalized_exercises.append("Create a 'possibility portfolio' where you write down different versions of your future without judging them. Include scenarios you're excited about alongside ones you're afraid of. For each, note one small step you could take to explore it. This transforms vague future anxiety into concrete options.")
-            
-            # Exercises based on detected interests
-            if "creative expression" in interests:
-                personalized_exercises.append("Try 'emotional color mapping': Choose colors that represent different feelings you're experiencing. Without planning, create an abstract image using these colors. Once complete, notice which colors dominate, which are in conflict, and where they harmonize. This provides visual insight into your emotional landscape.")
-            
-            if "nature" in interests:
-                personalized_exercises.append("Practice 'sensory nature immersion': Find a natural space (even a small park or garden) and spend 10 minutes systematically noticing something new through each sense. What subtle sounds, textures, or scents have you overlooked before? Research shows this practice reduces stress hormones more effectively than the same time spent in urban settings.")
-            
-            if "physical activity" in interests and "stress" in themes:
-                personalized_exercises.append("Incorporate 'micro-movements' throughout your day: Set a timer for once each hour and do 60 seconds of gentle movement (stretching, marching in place, or dancing to one song). These brief physical interludes interrupt stress cycles and release tension that accumulates when we're stationary.")
-            
-            if "mindfulness" in interests:
-                if confusion:
-                    personalized_exercises.append("Practice the 'RAIN' technique when feeling overwhelmed: Recognize the emotion, Allow it to be there without judgment, Investigate where you feel it in your body, and Nurture yourself with self-compassion. This approach helps you relate differently to difficult emotions without being controlled by them.")
-            
-            # General emotional wellbeing exercises if no specific themes detected
-            if not themes:
-                if frustration:
-                    personalized_exercises.append("Try the 'alternative perspectives' exercise: Write down a situation that's frustrating you. Then write three completely different interpretations of the same event. This cognitive flexibility practice helps reduce the feeling that your initial negative interpretation is the only possible truth.")
-                
-                if gratitude:
-                    personalized_exercises.append("Practice 'specific gratitude': Instead of just listing what you're grateful for, describe exactly how it affects you. For example, rather than 'I'm grateful for my friend,' try 'I'm grateful for how my friend remembered that small detail about my preference, which made me feel truly seen.' This depth amplifies the positive emotional impact.")
-                
-                personalized_exercises.append("Experiment with a 'values-based decision filter': Identify your top three personal values (such as connection, growth, authenticity, etc.) When facing choices, ask yourself which option best honors these values. This creates clarity when you feel conflicted about what to do next.")
-            
-            # If we somehow don't have enough exercises, add some general ones
-            while len(personalized_exercises) < 3:
-                general_exercises = [
-                    "Try a brief self-compassion practice: Place your hand on your heart, take three deep breaths, and tell yourself, 'This is a moment of difficulty. Difficulty is part of living. May I be kind to myself in this moment.' Research shows this simple practice can reduce stress hormones and increase feelings of connection.",
-                    "Experiment with 'mental subtraction': Identify something positive in your life, then imagine it never happened. Consider how different your life would be without this person, experience, or opportunity. This practice counteracts hedonic adaptation—our tendency to take positive aspects of life for granted.",
-                    "Practice the '3-3-3 grounding technique' when feeling overwhelmed: Name 3 things you can see, 3 things you can hear, and move 3 parts of your body. This simple exercise activates different parts of your brain and nervous system, creating an immediate shift in your emotional state."
-                ]
-                for exercise in general_exercises:
-                    if exercise not in personalized_exercises:
-                        personalized_exercises.append(exercise)
-                        if len(personalized_exercises) >= 3:
-                            break
-            
-            # Limit to 3 exercises
-            personalized_exercises = personalized_exercises[:3]
-            
-            # Create fallback response with personalized exercises
-            fallback_response = f"""
-            <p>Thank you for sharing your thoughts with me today. I notice from your journal entry that you're experiencing some {fallback_mood} emotions.</p>
-            
-            <p>Your words reveal layers of what you're going through right now. I sense this is an important moment for reflection on the feelings you've expressed.</p>
-            
-            <p>I appreciate the vulnerability and thoughtfulness in your writing. The way you've articulated your experience shows a level of self-awareness that's really valuable.</p>
-            
-            <p><strong>Based on what you've shared, here are some personalized practices that might support you:</strong></p>
-            """
-            
-            # Add personalized exercises
-            for i, exercise in enumerate(personalized_exercises, 1):
-                fallback_response += f"<p>{i}. {exercise}</p>"
-            
-            fallback_response += """
-            <p>Remember that your feelings are valid, and it's okay to experience the full range of emotions. I'm here whenever you need to reflect or process what's happening in your life.</p>
-            """
-            
-            response = fallback_response
+            # Keyword-based response built from the themes found in the entry
+            with timer.stage('fallback'):
+                response = build_fallback_response(journal_entry, mood)
+            metrics.count_fallback(api_error)
             print(f"API Error: {str(api_error)}")
         
-        return jsonify({
+        timer.finish('ok')
+        result = jsonify({
             'success': True,
             'sentiment': sentiment,
             'score': score_rounded,
             'response': response
         })
+        server_timing = timer.server_timing()
+        if server_timing:
+            result.headers['Server-Timing'] = server_timing
+        return result
     
     except Exception as e:
+        timer.finish('error')
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/submit/stream', methods=['POST'])
+def submit_stream():
+    # Same as /submit, but sent as Server-Sent Events: the sentiment as soon as
+    # it is known, then the LLM's HTML as it is generated
+    data = request.get_json(silent=True)
+    # Anything but a JSON object (e.g. an array) gets the same SSE error as an empty entry
+    journal_entry = (data.get('entry') if isinstance(data, dict) else None) or ''
+    timer = metrics.RequestTimer('/submit/stream')
+    
+    def generate():
+        # Headers are sent before the first event, so stage timings only go to
+        # /metrics; an abandoned stream is counted as 'disconnected'
+        outcome = 'disconnected'
+        try:
+            if not journal_entry.strip():
+                outcome = 'empty'
+                yield sse_event('error', {'error': 'Journal entry cannot be empty'})
+                return
+            timer.entry(journal_entry)
+            
+            with timer.stage('sentiment'):
+                sentiment, mood, score_rounded = analyze_sentiment(journal_entry)
+            yield sse_event('sentiment', {'sentiment': sentiment, 'score': score_rounded})
+            
+            with timer.stage('prompt'):
+                prompt = build_prompt(journal_entry, sentiment, score_rounded)
+            response_key = response_cache_key(journal_entry)
+            try:
+                with timer.stage('llm'):
+                    cached = result_cache.get(response_key)
+                    if cached is not None:
+                        yield sse_event('token', {'html': cached})
+                    else:
+                        streamed = []
+                        for content in stream_response(prompt):
+                            streamed.append(content)
+                            yield sse_event('token', {'html': content})
+                        result_cache.set(response_key, ''.join(streamed))
+            except Exception as api_error:
+                # Replaces whatever was streamed before the failure
+                with timer.stage('fallback'):
+                    fallback = build_fallback_response(journal_entry, mood)
+                metrics.count_fallback(api_error)
+                yield sse_event('replace', {'html': fallback})
+                print(f"API Error: {str(api_error)}")
+            
+            outcome = 'ok'
+            yield sse_event('done', {})
+        except Exception as e:
+            outcome = 'error'
+            yield sse_event('error', {'error': str(e)})
+        finally:
+            timer.finish(outcome)
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        # Stop nginx and similar proxies from buffering the stream
+        'X-Accel-Buffering': 'no'
+    })
+
+def bulk_response(index, entry_id, journal_entry, sentiment, mood, score_rounded):
+    # One entry of a bulk upload; runs on the upload's thread pool
+    prompt = build_prompt(journal_entry, sentiment, score_rounded)
+    fallback = False
+    try:
+        response = generate_response(prompt, response_cache_key(journal_entry), rate_limiter=bulk_rate_limiter)
+    except Exception as api_error:
+        response = build_fallback_response(journal_entry, mood)
+        metrics.count_fallback(api_error)
+        fallback = True
+        print(f"API Error: {str(api_error)}")
+    return {
+        'index': index,
+        'id': entry_id,
+        'success': True,
+        'sentiment': sentiment,
+        'score': score_rounded,
+        'response': response,
+        'fallback': fallback
+    }
+
+def bulk_results(entries, timer):
+    # Reads entries a batch at a time and keeps at most 2 * BULK_LLM_CONCURRENCY
+    # of them waiting on Groq, so memory doesn't grow with the upload size.
+    # Results are yielded as they complete, not in upload order.
+    counts = {'entries': 0, 'fallbacks': 0, 'errors': 0}
+    outcome = 'disconnected'
+    pool = ThreadPoolExecutor(max_workers=BULK_LLM_CONCURRENCY, thread_name_prefix="bulk")
+    pending = set()
+    
+    def result_line(result):
+        counts['entries'] += 1
+        if not result['success']:
+            counts['errors'] += 1
+        elif result['fallback']:
+            counts['fallbacks'] += 1
+        return ndjson_line(result)
+    
+    def error_line(index, entry_id, error):
+        return result_line({'index': index, 'id': entry_id, 'success': False, 'error': error})
+    
+    def finished(futures):
+        for future in futures:
+            yield result_line(future.result())
+    
+    try:
+        for batch in batched(entries, BULK_BATCH_SIZE):
+            valid = []
+            for index, entry_id, journal_entry, error in batch:
+                if error:
+                    yield error_line(index, entry_id, error)
+                else:
+                    timer.entry(journal_entry)
+                    valid.append((index, entry_id, journal_entry))
+            if not valid:
+                continue
+            
+            with timer.stage('sentiment'):
+                sentiments = analyze_sentiments([journal_entry for _, _, journal_entry in valid])
+            for (index, entry_id, journal_entry), sentiment in zip(valid, sentiments):
+                if isinstance(sentiment, Exception):
+                    yield error_line(index, entry_id, str(sentiment))
+                    continue
+                while len(pending) >= 2 * BULK_LLM_CONCURRENCY:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    yield from finished(done)
+                pending.add(pool.submit(bulk_response, index, entry_id, journal_entry, *sentiment))
+            
+            done = {future for future in pending if future.done()}
+            pending -= done
+            yield from finished(done)
+        
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            yield from finished(done)
+        
+        outcome = 'ok'
+        yield ndjson_line({'summary': counts})
+    finally:
+        # Stops queued work if the client went away
+        pool.shutdown(wait=False, cancel_futures=True)
+        timer.finish(outcome)
+
+@app.route('/submit/bulk', methods=['POST'])
+def submit_bulk():
+    # For migrating existing journals. Takes NDJSON, one {"id": ..., "entry": ...}
+    # per line, as the request body or as an uploaded 'file', and streams back
+    # one NDJSON result per entry followed by a {"summary": ...} line.
+    upload = request.files.get('file')
+    stream = upload.stream if upload else request.stream
+    entries = parse_entries(iter_lines(stream, BULK_MAX_LINE_BYTES))
+    timer = metrics.RequestTimer('/submit/bulk')
+    return Response(stream_with_context(bulk_results(entries, timer)), mimetype='application/x-ndjson', headers={
+        'X-Accel-Buffering': 'no'
+    })
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,301 @@
+# Async serving mode: `uvicorn asgi:app`, or `GUNICORN_ASYNC=1 gunicorn -c gunicorn.conf.py`
+#
+# /submit and /submit/stream are handled on an event loop, so a worker waiting
+# on Groq isn't blocked and one process can keep many calls in flight. Groq is
+# reached through one pooled keep-alive HTTP client per process, with a cap on
+# concurrent calls. Every other route is passed through to the Flask app.
+import asyncio
+import contextlib
+import os
+import time
+
+import httpx
+from a2wsgi import WSGIMiddleware
+from groq import AsyncGroq
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount, Route
+
+import app as journal_app
+import metrics
+from circuit_breaker import CallReport, CircuitOpenError, DeadlineExceededError, QueueTimeoutError
+from fallback import build_fallback_response
+
+# Maximum Groq calls (including open streams) in flight per process; further
+# requests wait for a free slot
+GROQ_MAX_CONCURRENCY = int(os.getenv("GROQ_MAX_CONCURRENCY", "64"))
+# Upper bound on a non-streaming Groq call, and separately on waiting for a
+# slot. Read from the environment by app.py, which applies it to the sync
+# client too.
+GROQ_TIMEOUT_SECONDS = journal_app.GROQ_TIMEOUT_SECONDS
+GROQ_CONNECT_TIMEOUT_SECONDS = journal_app.GROQ_CONNECT_TIMEOUT_SECONDS
+
+groq_client = None
+llm_slots = None
+# Hedged calls that outlived their request, kept referenced until they finish
+background_calls = set()
+
+
+@contextlib.asynccontextmanager
+async def lifespan(_):
+    # Created per worker process, inside its event loop
+    global groq_client, llm_slots
+    llm_slots = asyncio.Semaphore(GROQ_MAX_CONCURRENCY)
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=GROQ_MAX_CONCURRENCY, max_keepalive_connections=GROQ_MAX_CONCURRENCY),
+        timeout=httpx.Timeout(GROQ_TIMEOUT_SECONDS, connect=GROQ_CONNECT_TIMEOUT_SECONDS),
+    )
+    try:
+        groq_client = AsyncGroq(api_key=journal_app.groq_api_key, http_client=http_client,
+                                max_retries=journal_app.GROQ_MAX_RETRIES)
+    except Exception as e:
+        # Same as the sync app: without a client every request gets the fallback
+        print(f"Could not initialize async Groq client: {e}")
+    yield
+    await http_client.aclose()
+
+
+async def analyze_sentiment(journal_entry):
+    # Inference runs on the sentiment batcher's thread (and is batched with
+    # other requests); awaiting its future keeps the event loop free
+    async def compute():
+        return await asyncio.wrap_future(journal_app.sentiment_batcher.submit(journal_entry))
+
+    sentiment_result = await journal_app.result_cache.get_or_compute_async(
+        journal_app.sentiment_cache_key(journal_entry), compute
+    )
+    return journal_app.interpret_sentiment(sentiment_result)
+
+
+@contextlib.asynccontextmanager
+async def llm_slot(timeout=None):
+    # Time spent waiting here is this server's backlog, so it is kept out of
+    # the Groq timeouts and never reported to the breaker
+    try:
+        await asyncio.wait_for(llm_slots.acquire(), timeout)
+    except asyncio.TimeoutError:
+        raise QueueTimeoutError(f"No free Groq slot within {timeout}s") from None
+    try:
+        yield
+    finally:
+        llm_slots.release()
+
+
+async def create_completion(prompt):
+    return await groq_client.chat.completions.create(**journal_app.completion_args(prompt))
+
+
+def _forget_call(task):
+    background_calls.discard(task)
+    if not task.cancelled():
+        # Mark the exception as retrieved; the breaker has already seen it
+        task.exception()
+
+
+async def generate_response(prompt, cache_key=None):
+    # Async counterpart of app.generate_response(), sharing its result cache,
+    # circuit breaker and GROQ_DEADLINE_SECONDS hedge
+    if cache_key is not None:
+        return await journal_app.result_cache.get_or_compute_async(
+            cache_key, lambda: _generate_response(prompt, cache_key)
+        )
+    return await _generate_response(prompt, None)
+
+
+async def _generate_response(prompt, cache_key):
+    breaker = journal_app.groq_breaker
+    if not breaker.allow_request():
+        raise CircuitOpenError("Groq circuit breaker is open")
+
+    report = CallReport(breaker)
+    started_at = []
+
+    async def call():
+        async with llm_slot(GROQ_TIMEOUT_SECONDS):
+            started = time.perf_counter()
+            started_at.append(started)
+            try:
+                completion = await asyncio.wait_for(create_completion(prompt), GROQ_TIMEOUT_SECONDS)
+            except Exception as e:
+                report.failure()
+                metrics.count_llm_error(e)
+                raise
+        report.success(time.perf_counter() - started)
+        content = completion.choices[0].message.content
+        if cache_key is not None:
+            # Also keeps the result of a call that finished after its deadline
+            await journal_app.result_cache.set_async(cache_key, content)
+        return content
+
+    deadline = journal_app.GROQ_DEADLINE_SECONDS
+    if not deadline:
+        return await call()
+
+    task = asyncio.ensure_future(call())
+    background_calls.add(task)
+    task.add_done_callback(_forget_call)
+    try:
+        return await asyncio.wait_for(asyncio.shield(task), deadline)
+    except asyncio.TimeoutError:
+        pass
+    if not started_at:
+        # Still waiting for a slot: dropped before it reaches Groq
+        task.cancel()
+        raise QueueTimeoutError(f"Groq call did not start within {deadline}s")
+    # The deadline applies to the call itself, not to the wait for a slot
+    try:
+        return await asyncio.wait_for(asyncio.shield(task), max(0, started_at[0] + deadline - time.perf_counter()))
+    except asyncio.TimeoutError:
+        # Counted as a bad call now; the call carries on (and may still fill
+        # the cache) but its outcome is no longer reported to the breaker
+        report.deadline_missed()
+        raise DeadlineExceededError(f"Groq did not respond within {deadline}s")
+
+
+async def stream_response(prompt):
+    # Async counterpart of app.stream_response(); the deadline covers the wait
+    # for each chunk, including the first
+    breaker = journal_app.groq_breaker
+    if not breaker.allow_request():
+        raise CircuitOpenError("Groq circuit breaker is open")
+
+    deadline = journal_app.GROQ_DEADLINE_SECONDS or None
+    first_token_seconds = None
+    async with llm_slot(deadline or GROQ_TIMEOUT_SECONDS):
+        started = time.perf_counter()
+        try:
+            stream = await asyncio.wait_for(
+                groq_client.chat.completions.create(**journal_app.completion_args(prompt), stream=True), deadline
+            )
+            async with stream:
+                chunks = stream.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), deadline)
+                    except StopAsyncIteration:
+                        break
+                    content = chunk.choices[0].delta.content
+                    if content:
+                        if first_token_seconds is None:
+                            first_token_seconds = time.perf_counter() - started
+                        yield content
+        except Exception as e:
+            breaker.record_failure()
+            metrics.count_llm_error(e)
+            raise
+    breaker.record_success(first_token_seconds or time.perf_counter() - started)
+
+
+async def submit(request):
+    timer = metrics.RequestTimer('/submit')
+    try:
+        data = await request.json()
+        journal_entry = data['entry']
+
+        if not journal_entry.strip():
+            timer.finish('empty')
+            return JSONResponse({'success': False, 'error': 'Journal entry cannot be empty'})
+        timer.entry(journal_entry)
+
+        with timer.stage('sentiment'):
+            sentiment, mood, score_rounded = await analyze_sentiment(journal_entry)
+        with timer.stage('prompt'):
+            prompt = journal_app.build_prompt(journal_entry, sentiment, score_rounded)
+
+        try:
+            with timer.stage('llm'):
+                response = await generate_response(prompt, journal_app.response_cache_key(journal_entry))
+        except Exception as api_error:
+            with timer.stage('fallback'):
+                response = await asyncio.to_thread(build_fallback_response, journal_entry, mood)
+            metrics.count_fallback(api_error)
+            print(f"API Error: {str(api_error)}")
+
+        timer.finish('ok')
+        server_timing = timer.server_timing()
+        return JSONResponse({
+            'success': True,
+            'sentiment': sentiment,
+            'score': score_rounded,
+            'response': response
+        }, headers={'Server-Timing': server_timing} if server_timing else None)
+
+    except Exception as e:
+        timer.finish('error')
+        return JSONResponse({'success': False, 'error': str(e)})
+
+
+async def submit_stream(request):
+    try:
+        data = await request.json()
+    except Exception:
+        data = None
+    journal_entry = (data.get('entry') if isinstance(data, dict) else None) or ''
+    timer = metrics.RequestTimer('/submit/stream')
+
+    async def generate():
+        outcome = 'disconnected'
+        try:
+            if not journal_entry.strip():
+                outcome = 'empty'
+                yield journal_app.sse_event('error', {'error': 'Journal entry cannot be empty'})
+                return
+            timer.entry(journal_entry)
+
+            with timer.stage('sentiment'):
+                sentiment, mood, score_rounded = await analyze_sentiment(journal_entry)
+            yield journal_app.sse_event('sentiment', {'sentiment': sentiment, 'score': score_rounded})
+
+            with timer.stage('prompt'):
+                prompt = journal_app.build_prompt(journal_entry, sentiment, score_rounded)
+            response_key = journal_app.response_cache_key(journal_entry)
+            try:
+                with timer.stage('llm'):
+                    cached = await journal_app.result_cache.get_async(response_key)
+                    if cached is not None:
+                        yield journal_app.sse_event('token', {'html': cached})
+                    else:
+                        streamed = []
+                        async for content in stream_response(prompt):
+                            streamed.append(content)
+                            yield journal_app.sse_event('token', {'html': content})
+                        await journal_app.result_cache.set_async(response_key, ''.join(streamed))
+            except Exception as api_error:
+                with timer.stage('fallback'):
+                    fallback = await asyncio.to_thread(build_fallback_response, journal_entry, mood)
+                metrics.count_fallback(api_error)
+                yield journal_app.sse_event('replace', {'html': fallback})
+                print(f"API Error: {str(api_error)}")
+
+            outcome = 'ok'
+            yield journal_app.sse_event('done', {})
+        except Exception as e:
+            outcome = 'error'
+            yield journal_app.sse_event('error', {'error': str(e)})
+        finally:
+            timer.finish(outcome)
+
+    return StreamingResponse(generate(), media_type='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+def input_terminated(wsgi_app):
+    # a2wsgi's wsgi.input ends where the request body does but doesn't say so,
+    # and Werkzeug drops bodies without a Content-Length (e.g. a chunked
+    # /submit/bulk upload) unless it does
+    def wrapped(environ, start_response):
+        environ['wsgi.input_terminated'] = True
+        return wsgi_app(environ, start_response)
+    return wrapped
+
+
+app = Starlette(
+    routes=[
+        Route('/submit', submit, methods=['POST']),
+        Route('/submit/stream', submit_stream, methods=['POST']),
+        Mount('/', app=WSGIMiddleware(input_terminated(journal_app.app))),
+    ],
+    lifespan=lifespan,
+)
@@ -0,0 +1,108 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+
+
+class SentimentBatcher:
+    """Micro-batching front end for a transformers text-classification pipeline.
+
+    Request threads call analyze() with a single entry. A background thread
+    collects whatever entries arrive within max_wait_ms (up to max_batch_size)
+    and runs them through the pipeline as one padded batch, then hands each
+    caller back its own label/score.
+    """
+
+    def __init__(self, analyzer, max_batch_size=16, max_wait_ms=10):
+        self.analyzer = analyzer
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self.batches = 0
+        self.items = 0
+
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+
+    def analyze(self, text, timeout=None):
+        # Same shape as one element of sentiment_analyzer(text)
+        return self.submit(text).result(timeout)
+
+    def submit(self, text):
+        # Non-blocking variant for async callers: asyncio.wrap_future(batcher.submit(text))
+        future = Future()
+        self._ensure_worker().put((text, future))
+        return future
+
+    def _ensure_worker(self):
+        pid = os.getpid()
+        with self._lock:
+            if self._worker_pid != pid:
+                # Threads don't survive fork, so a gunicorn worker forked from a
+                # preloaded app starts with a fresh queue and its own thread.
+                self._jobs = queue.Queue()
+                self._worker = None
+                self._worker_pid = pid
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, args=(self._jobs,), name="sentiment-batcher", daemon=True
+                )
+                self._worker.start()
+            return self._jobs
+
+    def _run(self, jobs):
+        while True:
+            batch = [jobs.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        batch.append(jobs.get(timeout=remaining))
+                    else:
+                        batch.append(jobs.get_nowait())
+                except queue.Empty:
+                    break
+            self._process(batch)
+
+    def _process(self, batch):
+        # Async callers may have cancelled their future while it was queued
+        # (e.g. a /submit/stream client went away); skip those entries
+        batch = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        texts = [text for text, _ in batch]
+        self.batches += 1
+        self.items += len(batch)
+
+        try:
+            results = self.analyzer(texts, batch_size=len(texts))
+        except Exception as e:
+            if len(batch) == 1:
+                _resolve(batch[0][1], error=e)
+                return
+            # Don't let one bad entry fail everyone else in the batch
+            for text, future in batch:
+                try:
+                    _resolve(future, self.analyzer(text)[0])
+                except Exception as item_error:
+                    _resolve(future, error=item_error)
+            return
+
+        for (_, future), result in zip(batch, results):
+            _resolve(future, result)
+
+
+def _resolve(future, result=None, error=None):
+    # A future that was already resolved must not take the batcher thread down
+    # and leave the rest of its batch waiting forever
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
@@ -0,0 +1,82 @@
+"""Sustained /submit throughput of the sync (gthread) and async (uvicorn) modes.
+
+Starts benchmarks/stub_llm.py as a fake Groq endpoint with a fixed response
+time, then runs one gunicorn worker per mode and drives /submit with a fixed
+number of concurrent clients for a set duration. Requests answered with the
+keyword fallback instead of the stub's reply are counted separately, since
+they mean the LLM call failed or timed out.
+
+    python benchmarks/bench_async.py --concurrency 8 32 128 --duration 15
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import DEFAULT_CORPUS, drive, load_corpus, percentile, run_app
+from stub_llm import StubLLMServer
+
+MODES = {
+    "sync": {"GUNICORN_ASYNC": "0"},
+    "async": {"GUNICORN_ASYNC": "1"},
+}
+
+
+def measure(port, entries, concurrency, duration):
+    # Latency and throughput count only the stub's replies
+    wall, latencies = drive(port, "/submit", entries, concurrency, duration=duration)
+    replies = latencies["ok"]
+    return {
+        "llm_responses": len(replies),
+        "fallbacks": len(latencies["fallback"]),
+        "errors": len(latencies["error"]),
+        "throughput_rps": round(len(replies) / wall, 2),
+        "p50_ms": round(statistics.median(replies) * 1000, 1) if replies else None,
+        "p95_ms": round(percentile(replies, 95) * 1000, 1) if replies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", choices=sorted(MODES), default=["sync", "async"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--duration", type=float, default=15, help="seconds per concurrency level")
+    parser.add_argument("--llm-ms", type=float, default=1000, help="stub LLM response time")
+    parser.add_argument("--port", type=int, default=8126)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--startup-timeout", type=float, default=600)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    entries = load_corpus(args.corpus)
+    stub = StubLLMServer(tokens=100, first_token_ms=args.llm_ms, token_ms=0)
+    stub.start()
+
+    results = []
+    try:
+        for mode in args.modes:
+            env = dict(MODES[mode], GROQ_BASE_URL=stub.base_url, GROQ_API_KEY="stub", WEB_CONCURRENCY="1",
+                       # Every request should reach the stub, not the result cache
+                       RESULT_CACHE_MAX_ENTRIES="0")
+            with run_app(args.port, env, args.startup_timeout):
+                for concurrency in args.concurrency:
+                    results.append(dict(mode=mode, concurrency=concurrency,
+                                        **measure(args.port, entries, concurrency, args.duration)))
+    finally:
+        stub.shutdown()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'mode':<6} {'conc':>5} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'fallback':>9} {'errors':>7}")
+    for row in results:
+        print(f"{row['mode']:<6} {row['concurrency']:>5} {row['throughput_rps']:>8.1f} "
+              f"{row['p50_ms'] or 0:>9.1f} {row['p95_ms'] or 0:>9.1f} {row['fallbacks']:>9} {row['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Latency, memory and label agreement of the sentiment inference backends.
+
+Each backend (see sentiment_backend.py) is loaded in a fresh subprocess so its
+memory is measured on its own. The subprocess classifies every corpus entry
+one at a time and then in batches, and reports timings, RSS/PSS and its
+labels. Labels and scores are compared with the fp32 pytorch pipeline.
+
+    python benchmarks/bench_backends.py --backends pytorch int8 onnx --threads 4
+
+Exits with status 1 if a backend agrees with pytorch on fewer than
+--min-agreement of the entries.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import DEFAULT_CORPUS, DEFAULT_MODEL, ROOT, load_corpus, percentile
+
+sys.path.insert(0, ROOT)
+
+REFERENCE = "pytorch"
+
+
+def measure(args):
+    # Runs inside the per-backend subprocess
+    from process_stats import memory_usage
+    from sentiment_backend import load_sentiment_analyzer
+
+    entries = load_corpus(args.corpus)
+    started = time.perf_counter()
+    analyzer = load_sentiment_analyzer(args.model, args.measure, threads=args.threads, onnx_path=args.onnx_path)
+    load_seconds = time.perf_counter() - started
+
+    # Warm-up, e.g. an ONNX Runtime session is only created on first use
+    analyzer(entries[:args.batch_size], batch_size=args.batch_size)
+
+    latencies, results = [], []
+    for _ in range(args.repeat):
+        results = []
+        for entry in entries:
+            started = time.perf_counter()
+            results.extend(analyzer([entry], batch_size=1))
+            latencies.append(time.perf_counter() - started)
+
+    batched = 0.0
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        analyzer(entries, batch_size=args.batch_size)
+        batched += time.perf_counter() - started
+
+    return {
+        "backend": args.measure,
+        "load_seconds": round(load_seconds, 2),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "batched_entries_per_s": round(len(entries) * args.repeat / batched, 1),
+        "memory": memory_usage(),
+        "labels": [r["label"] for r in results],
+        "scores": [r["score"] for r in results],
+    }
+
+
+def run_backend(args, backend):
+    command = [sys.executable, os.path.abspath(__file__), "--measure", backend,
+               "--model", args.model, "--corpus", args.corpus,
+               "--repeat", str(args.repeat), "--batch-size", str(args.batch_size)]
+    if args.threads:
+        command += ["--threads", str(args.threads)]
+    if args.onnx_path:
+        command += ["--onnx-path", args.onnx_path]
+    output = subprocess.run(command, cwd=ROOT, check=True, stdout=subprocess.PIPE, text=True).stdout
+    # The last line is the JSON report; anything before it is model loading chatter
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def compare(reference, result):
+    pairs = list(zip(reference["labels"], result["labels"]))
+    agreement = sum(1 for a, b in pairs if a == b) / len(pairs)
+    score_diff = max(abs(a - b) for a, b in zip(reference["scores"], result["scores"]))
+    return round(agreement, 4), round(score_diff, 4)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["pytorch", "int8", "onnx"])
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--threads", type=int, default=0, help="intra-op threads (default: per sentiment_backend)")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the corpus per measurement")
+    parser.add_argument("--onnx-path", help="where to export/load the ONNX model")
+    parser.add_argument("--min-agreement", type=float, default=0.0,
+                        help="fail if a backend's label agreement with pytorch is below this fraction")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args)))
+        return
+
+    backends = [REFERENCE] + [b for b in args.backends if b != REFERENCE]
+    results = [run_backend(args, backend) for backend in backends]
+    reference = results[0]
+    for result in results:
+        result["label_agreement"], result["max_score_diff"] = compare(reference, result)
+
+    if args.json:
+        print(json.dumps([{k: v for k, v in r.items() if k not in ("labels", "scores")} for r in results], indent=2))
+    else:
+        print(f"{len(reference['labels'])} entries, batch size {args.batch_size}, {args.repeat} passes\n")
+        print(f"{'backend':<8} {'load s':>7} {'p50 ms':>8} {'p95 ms':>8} {'batched/s':>10} "
+              f"{'RSS MB':>8} {'PSS MB':>8} {'agree':>7} {'max Δscore':>11}")
+        for r in results:
+            print(f"{r['backend']:<8} {r['load_seconds']:>7.2f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+                  f"{r['batched_entries_per_s']:>10.1f} {r['memory']['rss_mb'] or 0:>8.1f} "
+                  f"{r['memory']['pss_mb'] or 0:>8.1f} {r['label_agreement']:>7.1%} {r['max_score_diff']:>11.4f}")
+
+    if any(r["label_agreement"] < args.min_agreement for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
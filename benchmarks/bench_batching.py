@@ -0,0 +1,104 @@
+"""Throughput/latency of the per-request sentiment path vs. SentimentBatcher.
+
+Simulates concurrent /submit handlers: each client thread repeatedly sends one
+journal entry through either the raw pipeline (the old batch-of-one path) or
+the shared SentimentBatcher, and records per-call latency.
+
+    python benchmarks/bench_batching.py --concurrency 1 4 16 --requests 200
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import DEFAULT_CORPUS, DEFAULT_MODEL, ROOT, load_corpus, percentile
+
+sys.path.insert(0, ROOT)
+
+from batching import SentimentBatcher
+
+
+def run(analyze, entries, concurrency, total_requests):
+    latencies = []
+    lock = threading.Lock()
+    counter = iter(range(total_requests))
+
+    def client():
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            start = time.perf_counter()
+            analyze(entries[i % len(entries)])
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+
+    return {
+        "requests": len(latencies),
+        "throughput_rps": len(latencies) / wall,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=os.getenv("SENTIMENT_MODEL", DEFAULT_MODEL))
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--max-batch-size", type=int, default=16)
+    parser.add_argument("--max-wait-ms", type=float, default=10)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    from transformers import pipeline
+
+    entries = load_corpus(args.corpus)
+    analyzer = pipeline("text-classification", model=args.model, token=os.getenv("HF_API_KEY"))
+    batcher = SentimentBatcher(analyzer, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+
+    # Warm up both paths so one-off allocation costs don't skew the first run
+    analyzer(entries[0])
+    batcher.analyze(entries[0])
+
+    results = []
+    for concurrency in args.concurrency:
+        results.append(dict(mode="per-request", concurrency=concurrency,
+                            **run(lambda text: analyzer(text)[0], entries, concurrency, args.requests)))
+
+        batches_before, items_before = batcher.batches, batcher.items
+        row = dict(mode="batched", concurrency=concurrency,
+                   **run(batcher.analyze, entries, concurrency, args.requests))
+        row["mean_batch_size"] = (batcher.items - items_before) / max(1, batcher.batches - batches_before)
+        results.append(row)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'mode':<12} {'conc':>4} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'batch':>6}")
+    for row in results:
+        batch = f"{row['mean_batch_size']:.1f}" if "mean_batch_size" in row else "-"
+        print(f"{row['mode']:<12} {row['concurrency']:>4} {row['throughput_rps']:>8.1f} "
+              f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {batch:>6}")
+
+
+if __name__ == "__main__":
+    main()
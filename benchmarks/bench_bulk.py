@@ -0,0 +1,95 @@
+"""Throughput and worker memory of /submit/bulk on a large streamed upload.
+
+Starts benchmarks/stub_llm.py as a fake Groq endpoint, runs one gunicorn
+worker and streams a generated NDJSON upload of --entries entries (chunked,
+never held in memory) to /submit/bulk. While the results stream back, the
+worker's RSS is sampled ten times; it should stay flat however large the
+upload is.
+
+    python benchmarks/bench_bulk.py --entries 20000 --llm-concurrency 8
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import DEFAULT_CORPUS, ROOT, load_corpus, run_app
+from stub_llm import StubLLMServer
+
+sys.path.insert(0, ROOT)
+
+from process_stats import child_pids, memory_usage
+
+
+def upload(entries, count):
+    for i in range(count):
+        yield (json.dumps({"id": i, "entry": entries[i % len(entries)]}) + "\n").encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=20000)
+    parser.add_argument("--llm-concurrency", type=int, default=8)
+    parser.add_argument("--llm-rate", type=float, default=0, help="Groq calls per second (0 for no limit)")
+    parser.add_argument("--llm-ms", type=float, default=5, help="stub LLM response time")
+    parser.add_argument("--async-mode", action="store_true", help="serve through asgi.py")
+    parser.add_argument("--port", type=int, default=8127)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--startup-timeout", type=float, default=600)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    entries = load_corpus(args.corpus)
+    stub = StubLLMServer(tokens=20, first_token_ms=args.llm_ms, token_ms=0)
+    stub.start()
+
+    env = {
+        "GROQ_BASE_URL": stub.base_url, "GROQ_API_KEY": "stub", "WEB_CONCURRENCY": "1",
+        "GUNICORN_ASYNC": "1" if args.async_mode else "0",
+        "BULK_LLM_CONCURRENCY": str(args.llm_concurrency), "BULK_LLM_RATE_PER_SECOND": str(args.llm_rate),
+        # Every entry should reach the stub, and the cache would grow with the upload
+        "RESULT_CACHE_MAX_ENTRIES": "0",
+    }
+    try:
+        with run_app(args.port, env, args.startup_timeout, stdout=subprocess.DEVNULL) as proc:
+            worker = child_pids(proc.pid)[0]
+            conn = http.client.HTTPConnection("127.0.0.1", args.port, timeout=600)
+            start = time.perf_counter()
+            conn.request("POST", "/submit/bulk", body=upload(entries, args.entries),
+                         headers={"Content-Type": "application/x-ndjson"}, encode_chunked=True)
+            response = conn.getresponse()
+
+            rss, lines, summary = [], 0, None
+            sample_every = max(1, args.entries // 10)
+            for line in response:
+                lines += 1
+                if lines % sample_every == 0:
+                    rss.append(memory_usage(worker)["rss_mb"])
+                data = json.loads(line)
+                if "summary" in data:
+                    summary = data["summary"]
+            wall = time.perf_counter() - start
+    finally:
+        stub.shutdown()
+
+    result = {
+        "entries": args.entries,
+        "summary": summary,
+        "seconds": round(wall, 2),
+        "entries_per_s": round(args.entries / wall, 1),
+        "worker_rss_mb": rss,
+    }
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f"{args.entries} entries in {result['seconds']}s ({result['entries_per_s']} entries/s), summary {summary}")
+    print(f"worker RSS while streaming (MB): {rss}")
+
+
+if __name__ == "__main__":
+    main()
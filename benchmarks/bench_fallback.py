@@ -0,0 +1,94 @@
+"""Parity check and microbenchmark for the fallback theme matcher.
+
+Compares fallback.detect_themes() against the per-keyword scan it replaced,
+`any(word in entry.lower() for word in keywords)` for every table row, on the
+sample corpus plus randomly generated entries (exits non-zero on any
+mismatch), then times both at several entry lengths.
+
+    python benchmarks/bench_fallback.py --random-cases 20000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import DEFAULT_CORPUS, ROOT, load_corpus
+
+sys.path.insert(0, ROOT)
+
+from fallback import detect_themes
+from fallback_data import THEMES, INTERESTS, EMOTIONS
+
+# Long text with almost no keywords, where the old scan couldn't stop early
+NEUTRAL_TEXT = "The committee reviewed the quarterly figures and agreed on the schedule for the next session. "
+
+
+def scan_themes(journal_entry):
+    # The previous implementation: one lower() and one substring scan per keyword
+    return tuple(
+        [name for name, keywords in table if any(word in journal_entry.lower() for word in keywords)]
+        for table in (THEMES, INTERESTS, EMOTIONS)
+    )
+
+
+def generate_cases(corpus, count, seed):
+    rng = random.Random(seed)
+    keywords = [word for _, words in THEMES + INTERESTS + EMOTIONS for word in words]
+    # Filler, case variants and words that contain keywords ("startled" has "art")
+    vocabulary = keywords + [word.upper() for word in keywords] + [
+        "hopeful", "startled", "running", "downtown", "rested", "the", "and", "I", "today", "felt",
+    ]
+    cases = list(corpus)
+    for _ in range(count):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(0, 15))]
+        # Joining without spaces makes keywords overlap across word boundaries
+        cases.append(("" if rng.random() < 0.2 else " ").join(words))
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--random-cases", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[200, 2000, 20000, 200000])
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+
+    cases = generate_cases(corpus, args.random_cases, args.seed)
+    mismatches = [case for case in cases if detect_themes(case) != scan_themes(case)]
+
+    timings = []
+    for style, text in (("journal", " ".join(corpus)), ("neutral", NEUTRAL_TEXT)):
+        for length in args.lengths:
+            entry = (text * (length // len(text) + 1))[:length]
+            number = max(1, 200000 // length)
+            timings.append({
+                "text": style,
+                "length": length,
+                "scan_us": timeit.timeit(lambda: scan_themes(entry), number=number) / number * 1e6,
+                "matcher_us": timeit.timeit(lambda: detect_themes(entry), number=number) / number * 1e6,
+            })
+
+    if args.json:
+        print(json.dumps({"cases": len(cases), "mismatches": len(mismatches), "timings": timings}, indent=2))
+    else:
+        print(f"parity: {len(cases) - len(mismatches)}/{len(cases)} entries match")
+        for case in mismatches[:5]:
+            print(f"  mismatch: {case!r}: {detect_themes(case)} != {scan_themes(case)}")
+        print(f"{'text':<8} {'length':>8} {'scan us':>10} {'matcher us':>11} {'speedup':>8}")
+        for row in timings:
+            print(f"{row['text']:<8} {row['length']:>8} {row['scan_us']:>10.1f} {row['matcher_us']:>11.1f} "
+                  f"{row['scan_us'] / row['matcher_us']:>7.1f}x")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
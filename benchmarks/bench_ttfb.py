@@ -0,0 +1,113 @@
+"""Time-to-first-byte of /submit vs. /submit/stream against a local stub LLM.
+
+Starts benchmarks/stub_llm.py in-process, launches the app under gunicorn with
+GROQ_BASE_URL pointing at the stub, and for each entry records when the first
+byte, the sentiment, the first LLM token and the end of the response arrive.
+
+    python benchmarks/bench_ttfb.py --runs 10 --first-token-ms 300 --token-ms 20
+"""
+import argparse
+import http.client
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import DEFAULT_CORPUS, load_corpus, run_app
+from stub_llm import StubLLMServer
+
+
+def timed_post(port, path, entry):
+    # Returns (time to first byte, {event: time first seen}, total time)
+    body = json.dumps({"entry": entry})
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=300)
+    start = time.perf_counter()
+    conn.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    first_byte = None
+    events = {}
+    buffer = b""
+    while True:
+        chunk = response.read1(65536)
+        if not chunk:
+            break
+        now = time.perf_counter() - start
+        if first_byte is None:
+            first_byte = now
+        buffer += chunk
+        while b"\n\n" in buffer:
+            frame, buffer = buffer.split(b"\n\n", 1)
+            for line in frame.split(b"\n"):
+                if line.startswith(b"event:"):
+                    events.setdefault(line[6:].strip().decode(), now)
+    total = time.perf_counter() - start
+    conn.close()
+    return first_byte, events, total
+
+
+def summarize(values):
+    values = [v * 1000 for v in values if v is not None]
+    if not values:
+        return None
+    return {"p50_ms": round(statistics.median(values), 1), "max_ms": round(max(values), 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8125)
+    parser.add_argument("--tokens", type=int, default=500)
+    parser.add_argument("--first-token-ms", type=float, default=300)
+    parser.add_argument("--token-ms", type=float, default=20)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--startup-timeout", type=float, default=600)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    entries = load_corpus(args.corpus)
+
+    stub = StubLLMServer(tokens=args.tokens, first_token_ms=args.first_token_ms, token_ms=args.token_ms)
+    stub.start()
+
+    env = {"GROQ_BASE_URL": stub.base_url, "GROQ_API_KEY": "stub", "WEB_CONCURRENCY": "1",
+           # Every request should reach the stub, not the result cache
+           "RESULT_CACHE_MAX_ENTRIES": "0"}
+    try:
+        with run_app(args.port, env, args.startup_timeout):
+            buffered, streamed = [], []
+            for i in range(args.runs):
+                entry = entries[i % len(entries)]
+                buffered.append(timed_post(args.port, "/submit", entry))
+                streamed.append(timed_post(args.port, "/submit/stream", entry))
+    finally:
+        stub.shutdown()
+
+    results = {
+        "/submit": {
+            "first_byte": summarize(r[0] for r in buffered),
+            "total": summarize(r[2] for r in buffered),
+        },
+        "/submit/stream": {
+            "first_byte": summarize(r[0] for r in streamed),
+            "sentiment": summarize(r[1].get("sentiment") for r in streamed),
+            "first_token": summarize(r[1].get("token") for r in streamed),
+            "total": summarize(r[2] for r in streamed),
+        },
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for path, timings in results.items():
+        print(path)
+        for name, summary in timings.items():
+            if summary:
+                print(f"  {name:<12} p50 {summary['p50_ms']:>8.1f} ms   max {summary['max_ms']:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Cold-start time and memory of gunicorn workers with and without preloading.
+
+Starts gunicorn (using gunicorn.conf.py) once with GUNICORN_PRELOAD=1 and once
+with GUNICORN_PRELOAD=0, waits until every worker has logged that it is ready,
+then reads RSS/PSS of the master and each worker from /proc. PSS is the figure
+to compare: RSS counts the shared model weights once per worker.
+
+    python benchmarks/bench_workers.py --workers 4
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from process_stats import child_pids, memory_usage
+
+READY_LINE = re.compile(r"Worker (\d+) ready in ([\d.]+)s")
+
+
+def measure(preload, workers, port, startup_timeout):
+    env = dict(os.environ,
+               GUNICORN_PRELOAD="1" if preload else "0",
+               WEB_CONCURRENCY=str(workers),
+               GUNICORN_BIND=f"127.0.0.1:{port}")
+    started = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"],
+                            cwd=ROOT, env=env, stderr=subprocess.PIPE, text=True)
+
+    cold_starts = {}
+    all_ready = threading.Event()
+
+    def read_log():
+        for line in proc.stderr:
+            match = READY_LINE.search(line)
+            if match:
+                cold_starts[int(match.group(1))] = float(match.group(2))
+                if len(cold_starts) >= workers:
+                    all_ready.set()
+
+    threading.Thread(target=read_log, daemon=True).start()
+    try:
+        if not all_ready.wait(startup_timeout):
+            raise RuntimeError(f"only {len(cold_starts)}/{workers} workers became ready")
+        time_to_ready = time.perf_counter() - started
+
+        worker_memory = {pid: memory_usage(pid) for pid in child_pids(proc.pid)}
+        master_memory = memory_usage(proc.pid)
+    finally:
+        proc.terminate()
+        proc.wait(30)
+
+    processes = [master_memory] + list(worker_memory.values())
+    return {
+        "preload": preload,
+        "workers": workers,
+        "time_to_all_ready_s": round(time_to_ready, 2),
+        "worker_cold_start_s": cold_starts,
+        "master": master_memory,
+        "per_worker": worker_memory,
+        "total_rss_mb": round(sum(p["rss_mb"] or 0 for p in processes), 1),
+        "total_pss_mb": round(sum(p["pss_mb"] or 0 for p in processes), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8123)
+    parser.add_argument("--startup-timeout", type=float, default=600)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = [measure(preload, args.workers, args.port, args.startup_timeout) for preload in (False, True)]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for row in results:
+        mode = "preload" if row["preload"] else "per-worker load"
+        cold = ", ".join(f"{s:.2f}" for s in row["worker_cold_start_s"].values())
+        print(f"{mode}: all {row['workers']} workers ready in {row['time_to_all_ready_s']}s "
+              f"(worker cold starts: {cold}s)")
+        print(f"  total RSS {row['total_rss_mb']} MB, total PSS {row['total_pss_mb']} MB")
+        for pid, mem in row["per_worker"].items():
+            print(f"  worker {pid}: rss {mem['rss_mb']} MB, pss {mem['pss_mb']} MB, private {mem['private_mb']} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Helpers shared by the benchmark scripts."""
+import contextlib
+import http.client
+import itertools
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus.txt")
+DEFAULT_MODEL = "tabularisai/multilingual-sentiment-analysis"
+
+# Appears in benchmarks/stub_llm.py's replies but not in the fallback response
+STUB_MARKER = "meaningful"
+
+
+def load_corpus(path=DEFAULT_CORPUS):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def wait_until_up(port, timeout, proc=None):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError(f"app exited with status {proc.returncode}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            conn.request("GET", "/stats")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError("app did not start in time")
+
+
+@contextlib.contextmanager
+def run_server(command, port, env=None, startup_timeout=600, **popen_kwargs):
+    """Run a server command from the repo root until the block exits."""
+    proc = subprocess.Popen(command, cwd=ROOT, env=dict(os.environ, **(env or {})), **popen_kwargs)
+    try:
+        wait_until_up(port, startup_timeout, proc)
+        yield proc
+    finally:
+        proc.terminate()
+        proc.wait(30)
+
+
+def run_app(port, env=None, startup_timeout=600, **popen_kwargs):
+    """Run the app under gunicorn.conf.py on 127.0.0.1:port until the block exits."""
+    env = dict(env or {}, GUNICORN_BIND=f"127.0.0.1:{port}")
+    command = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"]
+    return run_server(command, port, env, startup_timeout, **popen_kwargs)
+
+
+def run_flask(port, env=None, startup_timeout=600, **popen_kwargs):
+    """Run the app on Flask's threaded development server on 127.0.0.1:port."""
+    command = [sys.executable, "-m", "flask", "--app", "app", "run",
+               "--host", "127.0.0.1", "--port", str(port), "--no-debugger", "--no-reload"]
+    return run_server(command, port, env, startup_timeout, **popen_kwargs)
+
+
+def post_entry(port, path, entry):
+    """POST one entry to /submit or /submit/stream; returns "ok", "fallback" or "error"."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=300)
+    try:
+        conn.request("POST", path, body=json.dumps({"entry": entry}), headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        body = response.read().decode("utf-8", "replace")
+    except OSError:
+        return "error"
+    finally:
+        conn.close()
+    if response.status != 200:
+        return "error"
+    if path.endswith("/stream"):
+        if "event: done" not in body:
+            return "error"
+        return "fallback" if "event: replace" in body else "ok"
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return "error"
+    if not data.get("success"):
+        return "error"
+    return "ok" if STUB_MARKER in data["response"] else "fallback"
+
+
+def drive(port, path, entries, concurrency, requests=None, duration=None):
+    """Send entries in turn from `concurrency` client threads until `requests`
+    requests have been sent or `duration` seconds have passed.
+
+    Returns (wall seconds, {"ok": [...], "fallback": [...], "error": [...]})
+    with the latency of every request by outcome.
+    """
+    lock = threading.Lock()
+    counter = itertools.count()
+    stop_at = time.monotonic() + duration if duration is not None else None
+    latencies = {"ok": [], "fallback": [], "error": []}
+
+    def client():
+        while stop_at is None or time.monotonic() < stop_at:
+            with lock:
+                i = next(counter)
+            if requests is not None and i >= requests:
+                return
+            start = time.perf_counter()
+            outcome = post_entry(port, path, entries[i % len(entries)])
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies[outcome].append(elapsed)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, latencies
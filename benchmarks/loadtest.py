@@ -0,0 +1,234 @@
+"""Reproducible offline load test of /submit across servers, concurrency and entry lengths.
+
+Everything runs locally: the sentiment model is the tiny classifier from
+benchmarks/tiny_model.py (or --model), and Groq is benchmarks/stub_llm.py with
+configurable latency, jitter and error rate. For each server (Flask's
+development server, gunicorn, gunicorn in async mode) and each entry length
+and concurrency level, a fixed number of requests is sent and the results are
+reported:
+
+- throughput;
+- p50/p95/p99 latency;
+- fallback and error counts;
+- CPU time and RSS/PSS of the server's processes.
+
+Entries and the stub's behaviour come from --seed, so repeated runs send the
+same requests. Write the results with --output and compare a later run
+against them with --compare.
+
+    python benchmarks/loadtest.py --output baseline.json
+    python benchmarks/loadtest.py --compare baseline.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import DEFAULT_CORPUS, ROOT, drive, load_corpus, percentile, run_app, run_flask
+from stub_llm import StubLLMServer
+from tiny_model import build_tiny_model
+
+sys.path.insert(0, ROOT)
+
+from process_stats import child_pids, cpu_seconds, memory_usage
+
+SERVERS = {
+    "flask": (run_flask, {}),
+    "gunicorn": (run_app, {"GUNICORN_ASYNC": "0"}),
+    "gunicorn-async": (run_app, {"GUNICORN_ASYNC": "1"}),
+}
+
+
+def make_entries(corpus, length, count, seed):
+    # Journal-like entries of about `length` characters, built from random corpus lines
+    rng = random.Random(f"{seed}-{length}")
+    entries = []
+    for _ in range(count):
+        lines = []
+        while sum(len(line) + 1 for line in lines) < length:
+            lines.append(rng.choice(corpus))
+        text = " ".join(lines)
+        entries.append(text[:length].rsplit(" ", 1)[0] if len(text) > length else text)
+    return entries
+
+
+def process_tree(pid):
+    return [pid] + child_pids(pid)
+
+
+def tree_cpu_seconds(pid):
+    return sum(cpu_seconds(p) or 0 for p in process_tree(pid))
+
+
+def tree_memory(pid):
+    readings = [memory_usage(p) for p in process_tree(pid)]
+    return {
+        "rss_mb": round(sum(m["rss_mb"] or 0 for m in readings), 1),
+        "pss_mb": round(sum(m["pss_mb"] or 0 for m in readings), 1),
+    }
+
+
+def measure(port, path, entries, concurrency, requests):
+    wall, latencies = drive(port, path, entries, concurrency, requests=requests)
+    served = latencies["ok"] + latencies["fallback"]
+
+    def ms(pct):
+        return round(percentile(served, pct) * 1000, 1) if served else None
+
+    return wall, {
+        "requests": requests,
+        **{outcome: len(values) for outcome, values in latencies.items()},
+        "throughput_rps": round(len(served) / wall, 2),
+        "p50_ms": ms(50),
+        "p95_ms": ms(95),
+        "p99_ms": ms(99),
+    }
+
+
+def run_scenarios(args, model, stub):
+    corpus = load_corpus(args.corpus)
+    results = []
+    for server in args.servers:
+        run, server_env = SERVERS[server]
+        env = dict(
+            server_env,
+            SENTIMENT_MODEL=model,
+            GROQ_BASE_URL=stub.base_url,
+            GROQ_API_KEY="stub",
+            WEB_CONCURRENCY=str(args.workers),
+            # Every request should do the full work, not hit the result cache
+            RESULT_CACHE_MAX_ENTRIES="0",
+            RESULT_CACHE_PATH="",
+        )
+        with run(args.port, env, args.startup_timeout, stdout=subprocess.DEVNULL,
+                 stderr=None if args.verbose else subprocess.DEVNULL) as proc:
+            for length in args.entry_lengths:
+                entries = make_entries(corpus, length, max(args.requests, 1), args.seed)
+                for concurrency in args.concurrency:
+                    drive(args.port, args.endpoint, entries, concurrency, requests=args.warmup)
+                    cpu_before = tree_cpu_seconds(proc.pid)
+                    wall, stats = measure(args.port, args.endpoint, entries, concurrency, args.requests)
+                    cpu = tree_cpu_seconds(proc.pid) - cpu_before
+                    row = dict(server=server, endpoint=args.endpoint, entry_length=length,
+                               concurrency=concurrency, **stats,
+                               cpu_seconds=round(cpu, 2), cpu_percent=round(100 * cpu / wall, 1),
+                               **tree_memory(proc.pid))
+                    results.append(row)
+                    print(format_row(row), file=sys.stderr)
+    return results
+
+
+def scenario_key(row):
+    return row["server"], row["endpoint"], row["entry_length"], row["concurrency"]
+
+
+def format_row(row):
+    return (f"{row['server']:<15} {row['entry_length']:>6} {row['concurrency']:>5} {row['throughput_rps']:>8.1f} "
+            f"{row['p50_ms'] or 0:>9.1f} {row['p95_ms'] or 0:>9.1f} {row['p99_ms'] or 0:>9.1f} "
+            f"{row['fallback']:>8} {row['error']:>6} {row['cpu_percent']:>6.1f} {row['rss_mb']:>8.1f}")
+
+
+HEADER = (f"{'server':<15} {'length':>6} {'conc':>5} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'fallback':>8} {'errors':>6} {'cpu %':>6} {'RSS MB':>8}")
+
+
+def compare(results, baseline):
+    # Percentage change of throughput and tail latency per matching scenario
+    previous = {scenario_key(row): row for row in baseline["results"]}
+    print(f"\n{'server':<15} {'length':>6} {'conc':>5} {'req/s Δ':>9} {'p95 Δ':>9} {'p99 Δ':>9} {'RSS Δ':>9}")
+
+    def change(new, old):
+        return f"{(new - old) / old * 100:+.1f}%" if new is not None and old else "n/a"
+
+    for row in results:
+        old = previous.get(scenario_key(row))
+        if old is None:
+            continue
+        print(f"{row['server']:<15} {row['entry_length']:>6} {row['concurrency']:>5} "
+              f"{change(row['throughput_rps'], old['throughput_rps']):>9} {change(row['p95_ms'], old['p95_ms']):>9} "
+              f"{change(row['p99_ms'], old['p99_ms']):>9} {change(row['rss_mb'], old['rss_mb']):>9}")
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT, text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--servers", nargs="+", choices=sorted(SERVERS), default=["flask", "gunicorn", "gunicorn-async"])
+    parser.add_argument("--endpoint", default="/submit", choices=["/submit", "/submit/stream"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--entry-lengths", type=int, nargs="+", default=[100, 1000, 4000],
+                        help="entry sizes in characters")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=10, help="unmeasured requests before each scenario")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers")
+    parser.add_argument("--model", help="sentiment model id or directory (default: a freshly built tiny model)")
+    parser.add_argument("--llm-ms", type=float, default=200, help="stub LLM time to first token")
+    parser.add_argument("--llm-token-ms", type=float, default=0, help="stub LLM delay between tokens")
+    parser.add_argument("--llm-tokens", type=int, default=100, help="tokens per stub reply")
+    parser.add_argument("--llm-jitter-ms", type=float, default=0, help="stub latency varies by up to this much")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="share of stub calls that fail")
+    parser.add_argument("--llm-error-status", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8128)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--startup-timeout", type=float, default=600)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--verbose", action="store_true", help="show the server's log output")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    stub = StubLLMServer(tokens=args.llm_tokens, first_token_ms=args.llm_ms, token_ms=args.llm_token_ms,
+                         jitter_ms=args.llm_jitter_ms, error_rate=args.llm_error_rate,
+                         error_status=args.llm_error_status, seed=args.seed)
+    stub.start()
+    print(HEADER, file=sys.stderr)
+    try:
+        with tempfile.TemporaryDirectory(prefix="tiny-sentiment-") as tiny_dir:
+            model = args.model or build_tiny_model(tiny_dir, args.corpus, args.seed)
+            results = run_scenarios(args, model, stub)
+    finally:
+        stub.shutdown()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "model": args.model or "tiny",
+            "stub_llm": {"requests": stub.requests, "errors": stub.errors, **stub.settings},
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "verbose")},
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if baseline:
+        compare(results, baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Local stand-in for the Groq chat completions API.
+
+Serves POST /openai/v1/chat/completions in the same JSON and streaming (SSE)
+formats as Groq, generating a canned HTML reply at a configurable token rate,
+so the app can be benchmarked without network access or an API key. Latency
+can be jittered and a share of requests answered with an error; both are
+drawn from a seeded generator so runs are repeatable. Point the app at it
+with:
+
+    GROQ_BASE_URL=http://127.0.0.1:8090 GROQ_API_KEY=stub python app.py
+
+    python benchmarks/stub_llm.py --port 8090 --first-token-ms 300 --token-ms 20 --error-rate 0.05
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY_SENTENCE = "Thank you for sharing this with me, it sounds like a meaningful moment to reflect on. "
+
+
+def reply_tokens(count):
+    words = (REPLY_SENTENCE.split() * (count // len(REPLY_SENTENCE.split()) + 1))[:count]
+    tokens = [word + " " for word in words]
+    # Roughly one paragraph every 60 tokens, like the real responses
+    for i in range(0, len(tokens), 60):
+        tokens[i] = "<p>" + tokens[i]
+        end = min(i + 60, len(tokens)) - 1
+        tokens[end] = tokens[end].rstrip() + "</p>"
+    return tokens
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        settings = self.server.settings
+        tokens = reply_tokens(settings["tokens"])
+        created = int(time.time())
+        model = body.get("model", "stub")
+        fail, jitter = self.server.draw()
+
+        time.sleep(max(0, settings["first_token_ms"] + jitter) / 1000)
+
+        if fail:
+            self._send_json({"error": {"message": "Stub error", "type": "internal_server_error"}},
+                            status=settings["error_status"])
+            return
+
+        if not body.get("stream"):
+            time.sleep(settings["token_ms"] * len(tokens) / 1000)
+            self._send_json({
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "logprobs": None,
+                    "message": {"role": "assistant", "content": "".join(tokens)},
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(tokens), "total_tokens": len(tokens)},
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        try:
+            for i, token in enumerate(tokens):
+                if i:
+                    time.sleep(settings["token_ms"] / 1000)
+                self._send_event({
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"role": "assistant", "content": token}, "finish_reason": None}],
+                })
+            self._send_event({
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": ""}, "finish_reason": "stop"}],
+            })
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up on the stream (e.g. a deadline in the app)
+            pass
+
+    def _send_json(self, payload, status=200):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_event(self, payload):
+        self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode())
+        self.wfile.flush()
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, tokens=500, first_token_ms=300, token_ms=20,
+                 jitter_ms=0, error_rate=0.0, error_status=500, seed=0):
+        super().__init__((host, port), StubLLMHandler)
+        self.settings = {
+            "tokens": tokens, "first_token_ms": first_token_ms, "token_ms": token_ms,
+            "jitter_ms": jitter_ms, "error_rate": error_rate, "error_status": error_status,
+        }
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self):
+        # (answer with an error?, first-token jitter in ms) for the next request
+        with self._lock:
+            self.requests += 1
+            fail = self._random.random() < self.settings["error_rate"]
+            if fail:
+                self.errors += 1
+            jitter = self._random.uniform(-1, 1) * self.settings["jitter_ms"]
+        return fail, jitter
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self.base_url
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--tokens", type=int, default=500, help="tokens per reply")
+    parser.add_argument("--first-token-ms", type=float, default=300, help="delay before the first token")
+    parser.add_argument("--token-ms", type=float, default=20, help="delay between tokens")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="first-token delay varies by up to this much")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with an error")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status of those errors")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = StubLLMServer(args.host, args.port, args.tokens, args.first_token_ms, args.token_ms,
+                           args.jitter_ms, args.error_rate, args.error_status, args.seed)
+    print(f"Stub LLM listening on {server.base_url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
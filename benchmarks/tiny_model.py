@@ -0,0 +1,65 @@
+"""Builds a tiny, randomly initialised sentiment classifier for offline runs.
+
+It has the same labels and the same 512-token limit as
+tabularisai/multilingual-sentiment-analysis, and a word-level vocabulary taken
+from the benchmark corpus. It loads in well under a second and needs no
+download. The labels it predicts mean nothing, so use it to measure the
+serving path, not accuracy. The same seed always gives the same model.
+
+    python benchmarks/tiny_model.py --output /tmp/tiny-sentiment
+    SENTIMENT_MODEL=/tmp/tiny-sentiment python app.py
+"""
+import argparse
+import os
+import sys
+
+import torch
+from tokenizers import Tokenizer, models, normalizers, pre_tokenizers, processors, trainers
+from transformers import BertConfig, BertForSequenceClassification, PreTrainedTokenizerFast
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import DEFAULT_CORPUS, load_corpus
+
+LABELS = ["Very Negative", "Negative", "Neutral", "Positive", "Very Positive"]
+SPECIAL_TOKENS = ["[PAD]", "[UNK]", "[CLS]", "[SEP]"]
+
+
+def build_tiny_model(output, corpus=DEFAULT_CORPUS, seed=0):
+    tokenizer = Tokenizer(models.WordLevel(unk_token="[UNK]"))
+    tokenizer.normalizer = normalizers.Lowercase()
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.train_from_iterator(load_corpus(corpus), trainers.WordLevelTrainer(special_tokens=SPECIAL_TOKENS))
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="[CLS] $A [SEP]",
+        special_tokens=[(name, tokenizer.token_to_id(name)) for name in ("[CLS]", "[SEP]")],
+    )
+    fast_tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer, unk_token="[UNK]", pad_token="[PAD]",
+        cls_token="[CLS]", sep_token="[SEP]", model_max_length=512,
+    )
+
+    torch.manual_seed(seed)
+    config = BertConfig(
+        vocab_size=fast_tokenizer.vocab_size, hidden_size=32, intermediate_size=64,
+        num_hidden_layers=2, num_attention_heads=2, max_position_embeddings=512,
+        num_labels=len(LABELS), id2label=dict(enumerate(LABELS)),
+        label2id={label: i for i, label in enumerate(LABELS)},
+    )
+    model = BertForSequenceClassification(config).eval()
+    model.save_pretrained(output)
+    fast_tokenizer.save_pretrained(output)
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", required=True, help="directory to write the model to")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="text the vocabulary is built from")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(build_tiny_model(args.output, args.corpus, args.seed))
+
+
+if __name__ == "__main__":
+    main()
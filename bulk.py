@@ -0,0 +1,102 @@
+import json
+import threading
+import time
+
+
+class RateLimiter:
+    """Token bucket: acquire() blocks until another call is allowed.
+
+    rate is calls per second (0 disables the limit); up to `burst` calls can
+    go through at once after a quiet period.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1, rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def iter_lines(stream, max_bytes, chunk_size=64 * 1024):
+    # Reads fixed-size chunks so an upload of any size is never held in
+    # memory; a line longer than max_bytes is skipped and yielded as None
+    buffer = b""
+    skipping = False
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        lines = (buffer + chunk).split(b"\n")
+        buffer = lines.pop()
+        for line in lines:
+            yield None if skipping or len(line) > max_bytes else line
+            skipping = False
+        if len(buffer) > max_bytes:
+            buffer = b""
+            skipping = True
+    if skipping:
+        yield None
+    elif buffer:
+        yield buffer
+
+
+def parse_entries(lines):
+    """Yield (index, id, entry, error) for each non-blank NDJSON line.
+
+    A line is either {"entry": "...", "id": ...} (id optional) or a JSON
+    string. Lines that can't be used have entry None and an error message.
+    """
+    index = 0
+    for line in lines:
+        if line is not None and not line.strip():
+            continue
+        entry_id, entry, error = None, None, None
+        if line is None:
+            error = "Line is too long"
+        else:
+            try:
+                item = json.loads(line)
+            except ValueError:
+                item = None
+                error = "Line is not valid JSON"
+            if isinstance(item, dict):
+                entry_id = item.get("id")
+                item = item.get("entry")
+            if isinstance(item, str) and item.strip():
+                entry = item
+            elif error is None and item is not None and not isinstance(item, str):
+                error = "Journal entry must be a string"
+            elif error is None:
+                error = "Journal entry cannot be empty"
+        yield index, entry_id, entry, error
+        index += 1
+
+
+def batched(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def ndjson_line(data):
+    return json.dumps(data) + "\n"
@@ -0,0 +1,180 @@
+import threading
+import time
+from collections import deque
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit breaker is open."""
+
+
+class DeadlineExceededError(Exception):
+    """Raised when a hedged call misses its deadline (the call itself may still finish)."""
+
+
+class QueueTimeoutError(Exception):
+    """Raised when a call gave up waiting for a free slot before it started.
+
+    It reflects this server's backlog, not the dependency, so it is never
+    reported to the breaker.
+    """
+
+
+class CircuitBreaker:
+    """Tracks recent call outcomes and stops calling a failing dependency.
+
+    closed:    calls go through; failures and slow calls are recorded over a
+               sliding window and the breaker opens once their share reaches
+               failure_rate (after at least min_calls calls).
+    open:      allow_request() is False, so callers can fall back immediately,
+               until open_seconds have passed.
+    half_open: up to half_open_probes trial calls are let through; a success
+               closes the breaker again and a failure re-opens it. Probes
+               that never report back are replaced after open_seconds.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_rate=0.5, min_calls=5, window_seconds=60,
+                 slow_call_seconds=20, open_seconds=30, half_open_probes=1):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self.state = self.CLOSED
+        self.trips = 0
+        self.rejected = 0
+        self.successes = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.deadline_misses = 0
+
+        self._lock = threading.Lock()
+        self._window = deque()  # (timestamp, bad) per call, bad = failed or slow
+        self._opened_at = None
+        self._probes_in_flight = 0
+        self._probe_started_at = None
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    self.rejected += 1
+                    return False
+                self.state = self.HALF_OPEN
+                self._probes_in_flight = 0
+
+            if self.state == self.HALF_OPEN:
+                now = time.monotonic()
+                if self._probes_in_flight >= self.half_open_probes:
+                    if now - self._probe_started_at < self.open_seconds:
+                        self.rejected += 1
+                        return False
+                    # The earlier probes never reported back (e.g. abandoned requests)
+                    self._probes_in_flight = 0
+                self._probes_in_flight += 1
+                self._probe_started_at = now
+
+            return True
+
+    def record_success(self, latency):
+        slow = self.slow_call_seconds is not None and latency > self.slow_call_seconds
+        with self._lock:
+            self.successes += 1
+            if slow:
+                self.slow_calls += 1
+            self._record(bad=slow)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._record(bad=True)
+
+    def record_deadline_miss(self):
+        # A hedged call the caller stopped waiting for counts as bad straight
+        # away; its late outcome is not recorded (see CallReport)
+        with self._lock:
+            self.deadline_misses += 1
+            self._record(bad=True)
+
+    def _record(self, bad):
+        now = time.monotonic()
+
+        if self.state == self.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if bad:
+                self._open(now)
+            else:
+                self.state = self.CLOSED
+                self._window.clear()
+            return
+        if self.state == self.OPEN:
+            # A call that started before the breaker opened
+            return
+
+        self._window.append((now, bad))
+        while self._window and now - self._window[0][0] > self.window_seconds:
+            self._window.popleft()
+
+        calls = len(self._window)
+        if calls >= self.min_calls and sum(1 for _, b in self._window if b) / calls >= self.failure_rate:
+            self._open(now)
+
+    def _open(self, now):
+        self.state = self.OPEN
+        self.trips += 1
+        self._opened_at = now
+        self._window.clear()
+
+    def snapshot(self):
+        with self._lock:
+            state = self.state
+            if state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                # Becomes half-open on the next request
+                state = self.HALF_OPEN
+            return {
+                'state': state,
+                'trips': self.trips,
+                'rejected': self.rejected,
+                'successes': self.successes,
+                'failures': self.failures,
+                'slow_calls': self.slow_calls,
+                'deadline_misses': self.deadline_misses,
+                'recent_calls': len(self._window),
+                'recent_bad_calls': sum(1 for _, bad in self._window if bad),
+            }
+
+
+class CallReport:
+    """Reports the outcome of one call to a breaker, once.
+
+    A hedged call is reported as a deadline miss when its caller gives up on
+    it; whatever the call does afterwards is ignored, so a late success can't
+    keep the breaker closed through an outage.
+    """
+
+    def __init__(self, breaker):
+        self.breaker = breaker
+        self._lock = threading.Lock()
+        self._reported = False
+
+    def success(self, latency):
+        if self._claim():
+            self.breaker.record_success(latency)
+
+    def failure(self):
+        if self._claim():
+            self.breaker.record_failure()
+
+    def deadline_missed(self):
+        if self._claim():
+            self.breaker.record_deadline_miss()
+
+    def _claim(self):
+        with self._lock:
+            reported, self._reported = self._reported, True
+            return not reported
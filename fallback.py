@@ -0,0 +1,80 @@
+from fallback_data import THEMES, INTERESTS, EMOTIONS, EXERCISES, NO_THEME_EXERCISES, GENERAL_EXERCISES
+
+
+class KeywordMatcher:
+    """Finds which tags have a keyword in a text.
+
+    Keywords are matched as substrings of the lowercased text, the same way as
+    `any(word in text.lower() for word in keywords)`, but the text is lowered
+    once, each distinct keyword is looked for at most once, and keywords whose
+    tags have all been found already are skipped.
+    """
+
+    def __init__(self, groups):
+        tags_by_keyword = {}
+        for tag, keywords in groups:
+            for keyword in keywords:
+                tags_by_keyword.setdefault(keyword.lower(), set()).add(tag)
+        self._keywords = [(keyword, frozenset(tags)) for keyword, tags in tags_by_keyword.items()]
+
+    def match(self, text):
+        text = text.lower()
+        found = set()
+        for keyword, tags in self._keywords:
+            # `in` is a C-level search, much faster than any regex over the
+            # same text; common keywords hit early in journal-like entries
+            if not tags <= found and keyword in text:
+                found |= tags
+        return found
+
+
+# Built once at import so request handling only pays for the scan
+fallback_matcher = KeywordMatcher(THEMES + INTERESTS + EMOTIONS)
+
+
+def detect_themes(journal_entry):
+    """Return the (themes, interests, emotions) found in an entry, in table order."""
+    found = fallback_matcher.match(journal_entry)
+    return tuple([name for name, _ in table if name in found] for table in (THEMES, INTERESTS, EMOTIONS))
+
+
+def build_fallback_response(journal_entry, fallback_mood):
+    """HTML response used in place of the LLM's when the Groq call fails."""
+    found = fallback_matcher.match(journal_entry)
+    has_theme = any(name in found for name, _ in THEMES)
+
+    # Define personalized exercises based on combination of themes and interests
+    personalized_exercises = [text for required, text in EXERCISES if found.issuperset(required)]
+    if not has_theme:
+        personalized_exercises += [text for required, text in NO_THEME_EXERCISES if found.issuperset(required)]
+
+    # If we somehow don't have enough exercises, add some general ones
+    for exercise in GENERAL_EXERCISES:
+        if len(personalized_exercises) >= 3:
+            break
+        if exercise not in personalized_exercises:
+            personalized_exercises.append(exercise)
+
+    # Limit to 3 exercises
+    personalized_exercises = personalized_exercises[:3]
+
+    # Create fallback response with personalized exercises
+    fallback_response = f"""
+            <p>Thank you for sharing your thoughts with me today. I notice from your journal entry that you're experiencing some {fallback_mood} emotions.</p>
+
+            <p>Your words reveal layers of what you're going through right now. I sense this is an important moment for reflection on the feelings you've expressed.</p>
+
+            <p>I appreciate the vulnerability and thoughtfulness in your writing. The way you've articulated your experience shows a level of self-awareness that's really valuable.</p>
+
+            <p><strong>Based on what you've shared, here are some personalized practices that might support you:</strong></p>
+            """
+
+    # Add personalized exercises
+    for i, exercise in enumerate(personalized_exercises, 1):
+        fallback_response += f"<p>{i}. {exercise}</p>"
+
+    fallback_response += """
+            <p>Remember that your feelings are valid, and it's okay to experience the full range of emotions. I'm here whenever you need to reflect or process what's happening in your life.</p>
+            """
+
+    return fallback_response
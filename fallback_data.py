@@ -0,0 +1,83 @@
+# Keyword and exercise tables for the fallback response that submit() builds
+# when the Groq API is unavailable. Keywords are matched as lowercase
+# substrings of the entry (so "frustrat" also matches "frustrated").
+
+# Emotional themes, in the order they are reported
+THEMES = [
+    ("stress", ["stress", "anxiety", "worried", "overwhelmed", "pressure", "tense", "nervous", "panic"]),
+    ("sadness", ["sad", "down", "depressed", "unhappy", "lonely", "miss", "grief", "loss", "hurt"]),
+    ("happiness", ["happy", "joy", "excited", "grateful", "wonderful", "pleased", "delighted", "content"]),
+    ("relationships", ["friend", "partner", "family", "relationship", "boyfriend", "girlfriend", "husband", "wife", "mom", "dad", "parent", "child"]),
+    ("work", ["work", "job", "career", "boss", "project", "deadline", "colleague", "office", "meeting"]),
+    ("sleep", ["sleep", "tired", "insomnia", "rest", "exhausted", "fatigue", "bed", "dream"]),
+    ("health", ["health", "sick", "pain", "doctor", "illness", "symptom", "body", "physical"]),
+    ("future planning", ["future", "plan", "goal", "dream", "aspiration", "hope", "worry about", "uncertain"]),
+]
+
+# Activities the user mentions, used to tailor suggestions to their interests
+INTERESTS = [
+    ("physical activity", ["exercise", "workout", "run", "gym", "walk", "yoga", "fitness"]),
+    ("mindfulness", ["meditate", "meditation", "mindfulness", "breathe", "breathing", "calm"]),
+    ("creative expression", ["art", "write", "create", "music", "play", "paint", "draw", "sing", "creative"]),
+    ("nature", ["nature", "outside", "outdoors", "park", "garden", "hike", "trees", "plants"]),
+]
+
+# Specific emotions beyond the positive/negative sentiment label
+EMOTIONS = [
+    ("frustration", ["frustrat", "annoy", "irritate", "upset", "bothered"]),
+    ("hope", ["hope", "optimistic", "looking forward", "better", "improve"]),
+    ("confusion", ["confus", "uncertain", "not sure", "don't know", "unclear", "lost"]),
+    ("gratitude", ["grateful", "thankful", "appreciate", "blessed"]),
+]
+
+# (required themes/interests/emotions, exercise) in priority order; an exercise
+# is suggested when everything it requires was detected in the entry
+EXERCISES = [
+    (("work", "frustration"),
+     "Try the 'Three Good Things at Work' exercise: At the end of each workday this week, write down three things that went well at work, no matter how small. For each positive event, note your role in it. This practice can help rebalance your perspective when work frustrations feel overwhelming."),
+    (("work", "stress"),
+     "Practice the '90-second pause' technique when work stress arises: Set a timer for 90 seconds and focus only on your breathing while acknowledging the stress sensation in your body. Research shows most emotional reactions biochemically last about 90 seconds if we don't continue to feed them with thoughts. This gives you a reset button during challenging workdays."),
+    (("work",),
+     "Create a 'work containment ritual' to separate your professional and personal life. At the end of your workday, write down your top three priorities for tomorrow, then physically close your laptop or put away work materials while saying 'Work is complete for today.' This creates a psychological boundary that can prevent work stress from spilling into your personal time."),
+    (("relationships", "sadness"),
+     "Write a 'connection letter' (unsent) to the person you're missing or having challenges with. Express your feelings honestly without judgment, then ask yourself what core need is being revealed through these emotions. Often, relationship difficulties point to important values like security, recognition, or understanding."),
+    (("relationships",),
+     "Practice 'active listening plus' in your next important conversation: Give your full attention, avoid interrupting, and summarize what you've heard. Then add the 'plus' - ask one curious question that invites deeper sharing. This demonstrates genuine interest beyond just hearing words."),
+    (("sleep",),
+     "Try the '4-7-8 breathing technique' before bed: Inhale quietly through your nose for 4 seconds, hold your breath for 7 seconds, then exhale completely through your mouth for 8 seconds. Repeat 4 times. This pattern helps activate your parasympathetic nervous system, countering the sleep-disrupting effects of stress."),
+    (("sleep",),
+     "Create a 'worry drop' ritual before sleep: Keep a dedicated notepad by your bed. When racing thoughts arise, write them down completely, then visualize physically placing them in a container until morning. Tell yourself, 'I've saved these thoughts and can address them tomorrow with a fresher mind.'"),
+    (("health",),
+     "Practice a 3-minute body appreciation scan: Starting at your feet and moving upward, acknowledge something each part of your body allows you to do, regardless of pain or limitation. This shifts focus from what's wrong to what's still working, which research shows can actually reduce perceived pain intensity."),
+    (("health", "stress"),
+     "Try 'symptom scheduling' for health anxiety: Set aside 5-10 minutes twice daily to focus completely on physical sensations and health concerns. Outside these times, when health worries arise, gently remind yourself they'll be addressed during the next scheduled session. This prevents health concerns from constantly interrupting your day."),
+    (("future planning", "confusion"),
+     "Use the 'Values Compass' exercise: List 5-7 core values (like connection, growth, security, etc.) Then rate how satisfied you feel with each one currently (1-10) and identify one small action for your highest priority value. When feeling uncertain about the future, this reconnects you with what matters most."),
+    (("future planning", "hope"),
+     "Create a 'possibility portfolio' where you write down different versions of your future without judging them. Include scenarios you're excited about alongside ones you're afraid of. For each, note one small step you could take to explore it. This transforms vague future anxiety into concrete options."),
+    (("creative expression",),
+     "Try 'emotional color mapping': Choose colors that represent different feelings you're experiencing. Without planning, create an abstract image using these colors. Once complete, notice which colors dominate, which are in conflict, and where they harmonize. This provides visual insight into your emotional landscape."),
+    (("nature",),
+     "Practice 'sensory nature immersion': Find a natural space (even a small park or garden) and spend 10 minutes systematically noticing something new through each sense. What subtle sounds, textures, or scents have you overlooked before? Research shows this practice reduces stress hormones more effectively than the same time spent in urban settings."),
+    (("physical activity", "stress"),
+     "Incorporate 'micro-movements' throughout your day: Set a timer for once each hour and do 60 seconds of gentle movement (stretching, marching in place, or dancing to one song). These brief physical interludes interrupt stress cycles and release tension that accumulates when we're stationary."),
+    (("mindfulness", "confusion"),
+     "Practice the 'RAIN' technique when feeling overwhelmed: Recognize the emotion, Allow it to be there without judgment, Investigate where you feel it in your body, and Nurture yourself with self-compassion. This approach helps you relate differently to difficult emotions without being controlled by them."),
+]
+
+# Checked after EXERCISES, only when no theme at all was detected
+NO_THEME_EXERCISES = [
+    (("frustration",),
+     "Try the 'alternative perspectives' exercise: Write down a situation that's frustrating you. Then write three completely different interpretations of the same event. This cognitive flexibility practice helps reduce the feeling that your initial negative interpretation is the only possible truth."),
+    (("gratitude",),
+     "Practice 'specific gratitude': Instead of just listing what you're grateful for, describe exactly how it affects you. For example, rather than 'I'm grateful for my friend,' try 'I'm grateful for how my friend remembered that small detail about my preference, which made me feel truly seen.' This depth amplifies the positive emotional impact."),
+    ((),
+     "Experiment with a 'values-based decision filter': Identify your top three personal values (such as connection, growth, authenticity, etc.) When facing choices, ask yourself which option best honors these values. This creates clarity when you feel conflicted about what to do next."),
+]
+
+# Used to top the suggestions up to three
+GENERAL_EXERCISES = [
+    "Try a brief self-compassion practice: Place your hand on your heart, take three deep breaths, and tell yourself, 'This is a moment of difficulty. Difficulty is part of living. May I be kind to myself in this moment.' Research shows this simple practice can reduce stress hormones and increase feelings of connection.",
+    "Experiment with 'mental subtraction': Identify something positive in your life, then imagine it never happened. Consider how different your life would be without this person, experience, or opportunity. This practice counteracts hedonic adaptation—our tendency to take positive aspects of life for granted.",
+    "Practice the '3-3-3 grounding technique' when feeling overwhelmed: Name 3 things you can see, 3 things you can hear, and move 3 parts of your body. This simple exercise activates different parts of your brain and nervous system, creating an immediate shift in your emotional state.",
+]
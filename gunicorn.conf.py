@@ -0,0 +1,71 @@
+# gunicorn configuration: `gunicorn -c gunicorn.conf.py`
+#
+# By default the app (and with it the sentiment model) is imported once in the
+# master and workers are forked from it, so the torch weights are shared
+# copy-on-write instead of every worker loading its own copy. Set
+# GUNICORN_PRELOAD=0 to go back to one model load per worker for comparison.
+import gc
+import os
+import shutil
+import tempfile
+import time
+
+from process_stats import memory_usage
+
+wsgi_app = "app:app"
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+# Written back to the environment so the app sees the worker count it runs
+# under (sentiment_backend.default_threads() splits the cores between workers)
+workers = int(os.environ.setdefault("WEB_CONCURRENCY", "2"))
+# More than one thread per worker gives the sentiment batcher something to batch
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") != "0"
+
+if os.getenv("GUNICORN_ASYNC", "0") != "0":
+    # Serve asgi.py from an event loop per worker instead of a thread per request
+    wsgi_app = "asgi:app"
+    worker_class = "uvicorn.workers.UvicornWorker"
+
+# Each worker writes its metrics to files here so /metrics can add them up. Set
+# before the app (and prometheus_client) is imported; a fresh directory per
+# start so counters from a previous run are not included.
+_metrics_dir = None
+if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    _metrics_dir = tempfile.mkdtemp(prefix="journal-metrics-")
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = _metrics_dir
+
+_master_started = time.perf_counter()
+
+
+def when_ready(server):
+    if server.cfg.preload_app:
+        # Move everything the app allocated into the permanent generation so the
+        # workers' garbage collector never writes to (and un-shares) those pages
+        gc.freeze()
+    server.log.info(
+        "Master ready in %.2fs (preload_app=%s, memory=%s)",
+        time.perf_counter() - _master_started, server.cfg.preload_app, memory_usage(),
+    )
+
+
+def post_fork(server, worker):
+    worker.fork_started = time.perf_counter()
+    if server.cfg.preload_app:
+        import app as journal_app
+        journal_app.groq_client = journal_app.create_groq_client()
+
+
+def post_worker_init(worker):
+    import app as journal_app
+
+    journal_app.worker_cold_start_seconds = round(time.perf_counter() - worker.fork_started, 3)
+    worker.log.info(
+        "Worker %s ready in %.2fs (memory=%s)",
+        worker.pid, journal_app.worker_cold_start_seconds, memory_usage(),
+    )
+
+
+def on_exit(server):
+    if _metrics_dir:
+        shutil.rmtree(_metrics_dir, ignore_errors=True)
@@ -0,0 +1,128 @@
+"""Request counters, per-stage timings and the Prometheus /metrics output.
+
+METRICS_MODE selects how much is recorded:
+
+off    nothing
+light  request, fallback and LLM error counters, entry lengths and the total
+       time per request (the default; cheap enough to leave on)
+full   also a histogram per stage (sentiment, prompt, llm, fallback) and a
+       Server-Timing header on /submit responses
+
+Under gunicorn every worker writes its samples to PROMETHEUS_MULTIPROC_DIR
+(set up by gunicorn.conf.py), so /metrics reports the sum over all workers
+whichever one serves it.
+"""
+import os
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+METRICS_MODE = os.getenv("METRICS_MODE", "light")
+if METRICS_MODE not in ("off", "light", "full"):
+    raise ValueError(f"METRICS_MODE must be off, light or full, not {METRICS_MODE!r}")
+ENABLED = METRICS_MODE != "off"
+PER_STAGE = METRICS_MODE == "full"
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+# Groq calls can take tens of seconds, sentiment inference a few milliseconds
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+REQUESTS = Counter(
+    "journal_requests_total", "Journal submissions handled", ["endpoint", "outcome"]
+)
+FALLBACKS = Counter(
+    "journal_fallbacks_total", "Responses built by the keyword fallback instead of Groq", ["reason"]
+)
+LLM_ERRORS = Counter(
+    "journal_llm_errors_total", "Groq calls that failed", ["error"]
+)
+ENTRY_LENGTH = Histogram(
+    "journal_entry_length_chars", "Length of submitted journal entries in characters",
+    buckets=(50, 100, 250, 500, 1000, 2500, 5000, 10000),
+)
+REQUEST_SECONDS = Histogram(
+    "journal_request_seconds", "Time to handle a journal submission", ["endpoint"], buckets=SECONDS_BUCKETS
+)
+STAGE_SECONDS = Histogram(
+    "journal_stage_seconds", "Time spent in each stage of a submission (METRICS_MODE=full)", ["stage"],
+    buckets=SECONDS_BUCKETS,
+)
+
+
+def render():
+    # Returns the Prometheus text exposition of every metric
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
+
+def count_fallback(error):
+    if ENABLED:
+        FALLBACKS.labels(type(error).__name__).inc()
+
+
+def count_llm_error(error):
+    if ENABLED:
+        LLM_ERRORS.labels(type(error).__name__).inc()
+
+
+class _Stage:
+    __slots__ = ("timer", "name", "started")
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self.started
+        self.timer.stages.append((self.name, seconds))
+        STAGE_SECONDS.labels(self.name).observe(seconds)
+
+
+class _NoStage:
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NO_STAGE = _NoStage()
+
+
+class RequestTimer:
+    """Times one submission: `with timer.stage("llm"): ...`, then finish()."""
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.stages = []
+
+    def stage(self, name):
+        # A shared no-op outside METRICS_MODE=full
+        return _Stage(self, name) if PER_STAGE else _NO_STAGE
+
+    def entry(self, journal_entry):
+        if ENABLED:
+            ENTRY_LENGTH.observe(len(journal_entry))
+
+    def finish(self, outcome):
+        if ENABLED:
+            REQUESTS.labels(self.endpoint, outcome).inc()
+            REQUEST_SECONDS.labels(self.endpoint).observe(time.perf_counter() - self.started)
+
+    def server_timing(self):
+        # Value for a Server-Timing header, or None outside METRICS_MODE=full
+        if not PER_STAGE:
+            return None
+        timings = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages]
+        timings.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(timings)
@@ -0,0 +1,67 @@
+import os
+
+
+def _read_kb_fields(path, fields):
+    values = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                name, _, rest = line.partition(":")
+                if name in fields:
+                    values[name] = int(rest.split()[0])
+    except (OSError, ValueError, IndexError):
+        pass
+    return values
+
+
+def memory_usage(pid="self"):
+    """Memory of a process in MB, read from /proc (Linux only).
+
+    RSS counts every page a worker can see, including weights it shares with
+    the gunicorn master, so it over-reports preloaded workers. PSS splits
+    shared pages between the processes mapping them and is the number to sum
+    across workers; private_mb is what forking one more worker would cost.
+    """
+    status = _read_kb_fields(f"/proc/{pid}/status", {"VmRSS"})
+    rollup = _read_kb_fields(
+        f"/proc/{pid}/smaps_rollup",
+        {"Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty"},
+    )
+
+    def mb(kb):
+        return round(kb / 1024, 1) if kb is not None else None
+
+    shared = private = None
+    if rollup:
+        shared = rollup.get("Shared_Clean", 0) + rollup.get("Shared_Dirty", 0)
+        private = rollup.get("Private_Clean", 0) + rollup.get("Private_Dirty", 0)
+
+    return {
+        "rss_mb": mb(status.get("VmRSS")),
+        "pss_mb": mb(rollup.get("Pss")),
+        "shared_mb": mb(shared),
+        "private_mb": mb(private),
+    }
+
+
+def child_pids(pid):
+    """Direct children of pid, e.g. the workers of a gunicorn master."""
+    children = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children.extend(int(child) for child in f.read().split())
+    except OSError:
+        pass
+    return sorted(set(children))
+
+
+def cpu_seconds(pid="self"):
+    """User plus system CPU time a process has used so far, or None."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # Fields after the parenthesised command name, which may contain spaces
+            fields = f.read().rpartition(")")[2].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
@@ -0,0 +1,57 @@
+"""Opt-in sampling profiler for investigating the hot path (PROFILER_ENABLED=1).
+
+GET /debug/profile?seconds=10 samples the Python stack of every other thread
+in the worker that serves it, every PROFILER_INTERVAL_MS, and returns the
+counts in collapsed-stack format ("outer;inner;innermost count" per line),
+which flamegraph.pl and speedscope can render. Nothing runs until a profile
+is requested.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "0") != "0"
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "5"))
+MAX_SECONDS = 60
+
+_running = threading.Lock()
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a profile is requested while another one is running."""
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def sample_stacks(seconds, interval_ms=PROFILER_INTERVAL_MS):
+    """Sample all other threads' stacks for `seconds`; returns a Counter of
+    root-to-leaf stack strings joined with ';'."""
+    if not _running.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already being collected")
+    try:
+        own_thread = threading.get_ident()
+        interval = max(interval_ms, 1) / 1000
+        stacks = Counter()
+        deadline = time.monotonic() + min(seconds, MAX_SECONDS)
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                names = []
+                while frame is not None:
+                    names.append(_frame_name(frame))
+                    frame = frame.f_back
+                stacks[";".join(reversed(names))] += 1
+            time.sleep(interval)
+        return stacks
+    finally:
+        _running.release()
+
+
+def collapsed(stacks):
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
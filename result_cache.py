@@ -0,0 +1,273 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+
+_MISSING = object()
+# Handed to waiting callers when the caller computing a key was cancelled
+_ABANDONED = object()
+
+
+def normalize_entry(text):
+    # Entries that differ only in Unicode form or whitespace share a cache entry
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(*parts):
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Two-tier cache for JSON-serializable results, keyed by content hash.
+
+    Tier one is an in-process LRU bounded by max_entries; tier two is an
+    optional SQLite file at `path` that survives restarts and is shared by
+    every worker process using the same file. Both tiers expire entries after
+    ttl_seconds. get_or_compute() coalesces concurrent misses for the same key
+    within a process, so only one caller does the work and the rest wait for
+    its result; if that caller is cancelled, one of the others takes over.
+    """
+
+    def __init__(self, max_entries=1024, ttl_seconds=86400, path=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.disk_errors = 0
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> (expires_at, value), least recently used first
+        self._inflight = {}  # key -> Future of the caller computing it
+        self._local = threading.local()
+        self._writes = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._get_memory(key)
+            if value is not _MISSING:
+                self.memory_hits += 1
+                return value
+        value = self._get_disk(key)
+        if value is _MISSING:
+            self._count_miss()
+            return None
+        with self._lock:
+            self.disk_hits += 1
+            self._set_memory(key, value)
+        return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._set_memory(key, value)
+        self._set_disk(key, value)
+
+    async def get_async(self, key):
+        # SQLite lookups run on a thread so they don't stall the event loop
+        if not self.path:
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    async def set_async(self, key, value):
+        if not self.path:
+            return self.set(key, value)
+        await asyncio.to_thread(self.set, key, value)
+
+    def get_or_compute(self, key, compute):
+        while True:
+            value, future, leader = self._claim(key)
+            if value is not _MISSING:
+                return value
+            if leader:
+                break
+            value = future.result()
+            if value is not _ABANDONED:
+                return value
+
+        try:
+            value = self._get_disk(key)
+            if value is _MISSING:
+                self._count_miss()
+                value = compute()
+                self.set(key, value)
+            else:
+                self._promote(key, value)
+        except Exception as e:
+            self._release(key)
+            future.set_exception(e)
+            raise
+        except BaseException:
+            self._abandon(key, future)
+            raise
+        self._release(key)
+        future.set_result(value)
+        return value
+
+    async def get_or_compute_async(self, key, compute):
+        # Same as get_or_compute() for a coroutine function; coalesces with
+        # threads and coroutines alike
+        while True:
+            value, future, leader = self._claim(key)
+            if value is not _MISSING:
+                return value
+            if leader:
+                break
+            value = await asyncio.wrap_future(future)
+            if value is not _ABANDONED:
+                return value
+
+        try:
+            value = await asyncio.to_thread(self._get_disk, key) if self.path else _MISSING
+            if value is _MISSING:
+                self._count_miss()
+                value = await compute()
+                with self._lock:
+                    self._set_memory(key, value)
+                if self.path:
+                    await asyncio.to_thread(self._set_disk, key, value)
+            else:
+                self._promote(key, value)
+        except Exception as e:
+            self._release(key)
+            future.set_exception(e)
+            raise
+        except BaseException:
+            self._abandon(key, future)
+            raise
+        self._release(key)
+        future.set_result(value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._memory),
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else None,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'disk_errors': self.disk_errors,
+            }
+
+    def _claim(self, key):
+        # Returns (cached value, future to wait on, whether this caller computes it)
+        with self._lock:
+            value = self._get_memory(key)
+            if value is not _MISSING:
+                self.memory_hits += 1
+                return value, None, False
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return _MISSING, future, False
+            future = Future()
+            # Running futures can't be cancelled, so a waiting coroutine that
+            # is cancelled (through asyncio.wrap_future) leaves it alone
+            future.set_running_or_notify_cancel()
+            self._inflight[key] = future
+            return _MISSING, future, True
+
+    def _count_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def _release(self, key):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def _abandon(self, key, future):
+        # The computing caller was cancelled or interrupted. Its cancellation
+        # is not the waiting callers' error, so they claim the key again and
+        # one of them computes it instead
+        self._release(key)
+        future.set_result(_ABANDONED)
+
+    def _promote(self, key, value):
+        with self._lock:
+            self.disk_hits += 1
+            self._set_memory(key, value)
+
+    def _get_memory(self, key):
+        item = self._memory.get(key)
+        if item is None:
+            return _MISSING
+        expires_at, value = item
+        if expires_at < time.time():
+            del self._memory[key]
+            self.evictions += 1
+            return _MISSING
+        self._memory.move_to_end(key)
+        return value
+
+    def _set_memory(self, key, value):
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = (time.time() + self.ttl_seconds, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _db(self):
+        # One connection per thread, reopened after fork
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            # WAL lets several worker processes read while one writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _get_disk(self, key):
+        if not self.path:
+            return _MISSING
+        try:
+            row = self._db().execute(
+                "SELECT value FROM results WHERE key = ? AND expires_at >= ?", (key, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._disk_error(e)
+            return _MISSING
+        if row is None:
+            return _MISSING
+        return json.loads(row[0])
+
+    def _set_disk(self, key, value):
+        if not self.path:
+            return
+        now = time.time()
+        try:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO results (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), now + self.ttl_seconds),
+            )
+            self._writes += 1
+            if self._writes % 256 == 0:
+                db.execute("DELETE FROM results WHERE expires_at < ?", (now,))
+        except sqlite3.Error as e:
+            self._disk_error(e)
+
+    def _disk_error(self, error):
+        # The disk tier is an optimisation; carry on as a miss
+        with self._lock:
+            self.disk_errors += 1
+        print(f"Result cache error: {error}")
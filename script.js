@@ -25,7 +25,7 @@ document.addEventListener('DOMContentLoaded', function() {
         errorMessage.classList.add('hidden');
         
         try {
-            const response = await fetch('/submit', {
+            const response = await fetch('/submit/stream', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -33,14 +33,34 @@ document.addEventListener('DOMContentLoaded', function() {
                 body: JSON.stringify({ entry: entryText }),
             });
             
-            const data = await response.json();
-            
-            if (data.success) {
-                // Display the response
-                displayResponse(data);
-            } else {
-                showError(data.error || 'An error occurred while processing your entry.');
+            if (!response.ok) {
+                throw new Error(`Server responded with ${response.status}`);
             }
+            
+            // The sentiment arrives first, then the response HTML in pieces
+            let html = '';
+            await readEventStream(response, function(event, data) {
+                if (event === 'sentiment') {
+                    loadingSpinner.classList.add('hidden');
+                    displaySentiment(data);
+                    responseContent.innerHTML = '';
+                    
+                    // Show the response container
+                    responseContainer.classList.remove('hidden');
+                    
+                    // Scroll to response
+                    responseContainer.scrollIntoView({ behavior: 'smooth', block: 'start' });
+                } else if (event === 'token') {
+                    html += data.html;
+                    renderResponse(html);
+                } else if (event === 'replace') {
+                    // The AI response failed part way, so show the fallback instead
+                    html = data.html;
+                    renderResponse(html);
+                } else if (event === 'error') {
+                    showError(data.error || 'An error occurred while processing your entry.');
+                }
+            });
         } catch (error) {
             showError('Network error. Please try again later.');
             console.error('Error:', error);
@@ -49,7 +69,7 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     });
     
-    function displayResponse(data) {
+    function displaySentiment(data) {
         // Update sentiment indicator
         const sentiment = data.sentiment.toLowerCase();
         const score = data.score;
@@ -70,15 +90,52 @@ document.addEventListener('DOMContentLoaded', function() {
             sentimentIndicator.innerText = '😔';
             sentimentScore.innerText = `${score}% negative sentiment`;
         }
+    }
+    
+    async function readEventStream(response, onEvent) {
+        // Minimal Server-Sent Events parser for a fetch() response body
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
         
-        // Set the response content
-        responseContent.innerHTML = data.response;
-        
-        // Show the response container
-        responseContainer.classList.remove('hidden');
-        
-        // Scroll to response
-        responseContainer.scrollIntoView({ behavior: 'smooth', block: 'start' });
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) {
+                break;
+            }
+            buffer += decoder.decode(value, { stream: true });
+            
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const frame = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                
+                let event = 'message';
+                let data = '';
+                frame.split('\n').forEach(function(line) {
+                    if (line.startsWith('event:')) {
+                        event = line.slice(6).trim();
+                    } else if (line.startsWith('data:')) {
+                        data += line.slice(5).trim();
+                    }
+                });
+                onEvent(event, data ? JSON.parse(data) : {});
+            }
+        }
+    }
+    
+    let pendingHtml = null;
+    
+    function renderResponse(html) {
+        // Tokens can arrive faster than the screen refreshes, so only update
+        // the DOM once per animation frame
+        if (pendingHtml === null) {
+            requestAnimationFrame(function() {
+                responseContent.innerHTML = pendingHtml;
+                pendingHtml = null;
+            });
+        }
+        pendingHtml = html;
     }
     
     function showError(message) {
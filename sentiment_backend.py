@@ -0,0 +1,251 @@
+"""Selectable CPU inference backends for the sentiment classifier.
+
+pytorch  the fp32 transformers pipeline (the reference)
+int8     the same model with its Linear layers dynamically quantized to int8
+onnx     the model exported once to ONNX and run with ONNX Runtime
+         (needs `pip install onnxruntime onnx`)
+
+The int8 and onnx backends pad every batch to the smallest of a few fixed
+lengths ("buckets") that fits its longest entry, instead of to the longest
+entry itself, so the runtime sees a handful of input shapes.
+"""
+import contextlib
+import hashlib
+import importlib.util
+import os
+import threading
+
+import numpy as np
+import torch
+from transformers import AutoConfig, AutoModelForSequenceClassification, AutoTokenizer, pipeline
+from transformers.utils import cached_file
+
+BACKENDS = ("pytorch", "int8", "onnx")
+DEFAULT_BUCKETS = (32, 64, 128, 256, 512)
+
+
+def default_threads():
+    # Torch defaults to one thread per physical core; split them between the
+    # gunicorn workers so concurrent batches don't oversubscribe the CPU.
+    # gunicorn.conf.py sets WEB_CONCURRENCY when it falls back to its default.
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    return max(1, torch.get_num_threads() // max(1, workers))
+
+
+def default_onnx_path(model):
+    cache_dir = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    name = model.strip("/").replace("/", "--")
+    return os.path.join(cache_dir, "reflective-journal", f"{name}.onnx")
+
+
+def model_fingerprint(model, token=None):
+    """Short hash of the model's config and weight files as they are on disk.
+
+    For a Hugging Face model the files are symlinks into the hub cache whose
+    targets are named by content hash; for a local directory their size and
+    modification time stand in for the content. None if the files have not
+    been downloaded yet.
+    """
+    try:
+        config_path = cached_file(model, "config.json", token=token)
+    except OSError:
+        return None
+    directory = os.path.dirname(config_path)
+    digest = hashlib.sha256()
+    weights = False
+    for name in sorted(os.listdir(directory)):
+        if name != "config.json" and not name.endswith((".safetensors", ".bin", ".index.json")):
+            continue
+        path = os.path.join(directory, name)
+        stat = os.stat(path)
+        digest.update(f"{name}\0{os.path.basename(os.path.realpath(path))}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode())
+        weights = weights or name != "config.json"
+    if not weights:
+        return None
+    with open(config_path, "rb") as f:
+        digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def fingerprinted_path(path, fingerprint):
+    # model.onnx -> model.<fingerprint>.onnx, so an export of a different
+    # version of the model is never picked up
+    root, ext = os.path.splitext(path)
+    return f"{root}.{fingerprint}{ext or '.onnx'}"
+
+
+def load_sentiment_analyzer(model, backend="pytorch", token=None, threads=None,
+                            buckets=DEFAULT_BUCKETS, onnx_path=None):
+    """Return a callable used like the text-classification pipeline:
+    analyzer(texts, batch_size=n) -> [{'label': ..., 'score': ...}, ...]
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown sentiment backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+    threads = threads or default_threads()
+    torch.set_num_threads(threads)
+
+    if backend == "pytorch":
+        # Truncate like the other backends; longer entries would fail the batch
+        return pipeline("text-classification", model=model, token=token, truncation=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(model, token=token)
+
+    if backend == "int8":
+        torch_model = AutoModelForSequenceClassification.from_pretrained(model, token=token).eval()
+        with _single_thread():
+            quantized = torch.ao.quantization.quantize_dynamic(torch_model, {torch.nn.Linear}, dtype=torch.qint8)
+        return SequenceClassifier(tokenizer, TorchRunner(quantized), torch_model.config.id2label, buckets)
+
+    onnx_path = onnx_path or default_onnx_path(model)
+    fingerprint = model_fingerprint(model, token)
+    if fingerprint is not None and os.path.exists(fingerprinted_path(onnx_path, fingerprint)):
+        # Already exported from these exact files; only the labels are needed
+        id2label = AutoConfig.from_pretrained(model, token=token).id2label
+    else:
+        torch_model = AutoModelForSequenceClassification.from_pretrained(model, token=token).eval()
+        id2label = torch_model.config.id2label
+        # Loading may have downloaded the weights. Without a fingerprint the
+        # model is exported again on every start rather than risk a stale file.
+        fingerprint = model_fingerprint(model, token)
+        if fingerprint is None or not os.path.exists(fingerprinted_path(onnx_path, fingerprint)):
+            fingerprint = fingerprint or "unversioned"
+            export_onnx(torch_model, tokenizer, fingerprinted_path(onnx_path, fingerprint))
+    return SequenceClassifier(tokenizer, OnnxRunner(fingerprinted_path(onnx_path, fingerprint), threads), id2label, buckets)
+
+
+@contextlib.contextmanager
+def _single_thread():
+    # Keeps the gunicorn master from starting an OpenMP thread pool while it
+    # prepares the model, since forked workers would inherit it broken
+    threads = torch.get_num_threads()
+    torch.set_num_threads(1)
+    try:
+        yield
+    finally:
+        torch.set_num_threads(threads)
+
+
+class _LogitsOnly(torch.nn.Module):
+    def __init__(self, model, input_names):
+        super().__init__()
+        self.model = model
+        self.input_names = input_names
+
+    def forward(self, *inputs):
+        return self.model(**dict(zip(self.input_names, inputs))).logits
+
+
+def export_onnx(torch_model, tokenizer, path):
+    input_names = list(tokenizer.model_input_names)
+    sample = tokenizer(["ok"], return_tensors="pt")
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Written under a temporary name so a concurrently starting worker never
+    # loads a half-written file
+    partial = f"{path}.{os.getpid()}.tmp"
+    with _single_thread(), torch.no_grad():
+        torch.onnx.export(
+            _LogitsOnly(torch_model, input_names),
+            tuple(sample[name] for name in input_names),
+            partial,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dict({name: {0: "batch", 1: "sequence"} for name in input_names}, logits={0: "batch"}),
+            opset_version=17,
+            dynamo=False,
+        )
+    os.replace(partial, path)
+    print(f"Exported sentiment model to {path}")
+
+
+class TorchRunner:
+    def __init__(self, model):
+        self.model = model
+
+    def __call__(self, inputs):
+        with torch.inference_mode():
+            tensors = {name: torch.from_numpy(array) for name, array in inputs.items()}
+            return self.model(**tensors).logits.numpy()
+
+
+class OnnxRunner:
+    def __init__(self, path, threads):
+        if importlib.util.find_spec("onnxruntime") is None:
+            raise RuntimeError("SENTIMENT_BACKEND=onnx needs onnxruntime: pip install onnxruntime onnx")
+        self.path = path
+        self.threads = threads
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def __call__(self, inputs):
+        return self._get_session().run(["logits"], inputs)[0]
+
+    def _get_session(self):
+        # ONNX Runtime doesn't survive fork (a worker forked after it was
+        # imported aborts on exit), so it is imported and the session opened
+        # in each worker process on first use
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    import onnxruntime as ort
+                    options = ort.SessionOptions()
+                    options.intra_op_num_threads = self.threads
+                    options.inter_op_num_threads = 1
+                    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+                    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+                    self._session = ort.InferenceSession(self.path, options, providers=["CPUExecutionProvider"])
+                    self._pid = os.getpid()
+        return self._session
+
+
+class SequenceClassifier:
+    """Tokenizes, pads to a bucket length and runs a logits function."""
+
+    def __init__(self, tokenizer, run, id2label, buckets=DEFAULT_BUCKETS):
+        self.tokenizer = tokenizer
+        self.run = run
+        self.id2label = id2label
+        max_length = min(tokenizer.model_max_length, max(buckets))
+        self.buckets = tuple(b for b in sorted(buckets) if b < max_length) + (max_length,)
+
+    def __call__(self, texts, batch_size=None, **kwargs):
+        if isinstance(texts, str):
+            texts = [texts]
+        batch_size = batch_size or len(texts)
+        results = []
+        for start in range(0, len(texts), batch_size):
+            results.extend(self._classify(texts[start:start + batch_size]))
+        return results
+
+    def bucket_length(self, length):
+        for bucket in self.buckets:
+            if length <= bucket:
+                return bucket
+        return self.buckets[-1]
+
+    def _classify(self, texts):
+        # Entries longer than the largest bucket are truncated
+        encoded = self.tokenizer(list(texts), truncation=True, max_length=self.buckets[-1])
+        length = self.bucket_length(max(len(ids) for ids in encoded["input_ids"]))
+        left = self.tokenizer.padding_side == "left"
+
+        inputs = {}
+        for name in self.tokenizer.model_input_names:
+            pad = self.tokenizer.pad_token_id if name == "input_ids" else 0
+            array = np.full((len(texts), length), pad, dtype=np.int64)
+            for row, values in enumerate(encoded[name]):
+                if left:
+                    array[row, length - len(values):] = values
+                else:
+                    array[row, :len(values)] = values
+            inputs[name] = array
+
+        logits = self.run(inputs)
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=-1, keepdims=True)
+        return [
+            {"label": self.id2label[int(i)], "score": float(p[i])}
+            for p, i in zip(probs, probs.argmax(axis=-1))
+        ]
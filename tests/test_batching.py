@@ -0,0 +1,57 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batching import SentimentBatcher
+
+
+class GatedAnalyzer:
+    # Stands in for the pipeline; blocks until released so a test can act on
+    # futures while their batch is queued
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = []
+
+    def __call__(self, texts, batch_size=None):
+        if isinstance(texts, str):
+            texts = [texts]
+        self.release.wait(5)
+        self.calls.append(list(texts))
+        return [{'label': 'Neutral', 'score': len(text)} for text in texts]
+
+
+def test_cancelled_future_in_batch_does_not_stall_the_others():
+    analyzer = GatedAnalyzer()
+    batcher = SentimentBatcher(analyzer, max_batch_size=8, max_wait_ms=200)
+
+    futures = [batcher.submit(text) for text in ("a", "bb", "ccc")]
+    assert futures[1].cancel()
+    analyzer.release.set()
+
+    assert futures[0].result(timeout=2) == {'label': 'Neutral', 'score': 1}
+    assert futures[2].result(timeout=2) == {'label': 'Neutral', 'score': 3}
+    assert analyzer.calls == [["a", "ccc"]]
+    assert batcher._worker.is_alive()
+    # Later submissions are still served
+    assert batcher.analyze("dddd", timeout=2) == {'label': 'Neutral', 'score': 4}
+
+
+def test_future_resolved_elsewhere_does_not_kill_the_worker():
+    analyzer = GatedAnalyzer()
+    batcher = SentimentBatcher(analyzer, max_batch_size=8, max_wait_ms=200)
+
+    first = batcher.submit("a")
+    second = batcher.submit("bb")
+    # Waits until the worker has taken the batch, then resolves one future
+    # behind its back
+    while not first.running():
+        time.sleep(0.01)
+    first.set_result({'label': 'Positive', 'score': 0})
+    analyzer.release.set()
+
+    assert second.result(timeout=2) == {'label': 'Neutral', 'score': 2}
+    assert first.result() == {'label': 'Positive', 'score': 0}
+    assert batcher._worker.is_alive()
@@ -0,0 +1,117 @@
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bulk
+from bulk import RateLimiter, batched, iter_lines, parse_entries
+
+
+def lines(data, max_bytes=10, chunk_size=4):
+    return list(iter_lines(io.BytesIO(data), max_bytes, chunk_size=chunk_size))
+
+
+def test_lines_split_across_chunks_are_joined():
+    assert lines(b"abcdef\nghij\nk\n", chunk_size=4) == [b"abcdef", b"ghij", b"k"]
+
+
+def test_trailing_line_without_newline():
+    assert lines(b"ab\ncd") == [b"ab", b"cd"]
+    assert lines(b"ab\n") == [b"ab"]
+    assert lines(b"") == []
+
+
+def test_line_of_exactly_max_bytes_is_kept():
+    assert lines(b"0123456789\nx\n", max_bytes=10) == [b"0123456789", b"x"]
+    assert lines(b"0123456789", max_bytes=10) == [b"0123456789"]
+
+
+def test_long_line_split_across_chunks_is_skipped():
+    # The 11-byte line spans three 4-byte chunks; it is reported once as None
+    # and the lines around it are unaffected
+    assert lines(b"ab\n0123456789X\ncd\n", max_bytes=10) == [b"ab", None, b"cd"]
+
+
+def test_long_trailing_line_is_skipped():
+    assert lines(b"ab\n0123456789X", max_bytes=10) == [b"ab", None]
+
+
+def test_long_line_detected_within_one_chunk():
+    assert lines(b"0123456789X\nab\n", max_bytes=10, chunk_size=64) == [None, b"ab"]
+
+
+def test_parse_entries():
+    parsed = list(parse_entries([
+        b'{"id": "a", "entry": "first"}',
+        b"   ",
+        b'"second"',
+        None,
+        b"not json",
+        b'{"entry": "  "}',
+        b"5",
+        b'{"id": 7, "entry": ["x"]}',
+        b"null",
+    ]))
+    assert parsed == [
+        (0, "a", "first", None),
+        (1, None, "second", None),
+        (2, None, None, "Line is too long"),
+        (3, None, None, "Line is not valid JSON"),
+        (4, None, None, "Journal entry cannot be empty"),
+        (5, None, None, "Journal entry must be a string"),
+        (6, 7, None, "Journal entry must be a string"),
+        (7, None, None, "Journal entry cannot be empty"),
+    ]
+
+
+def test_batched():
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(batched([], 2)) == []
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_rate_limiter_refills_at_rate(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(bulk, "time", clock)
+    limiter = RateLimiter(rate=2, burst=2)
+
+    # The burst goes through at once
+    limiter.acquire()
+    limiter.acquire()
+    assert clock.sleeps == []
+
+    # Then one call per 1/rate seconds
+    limiter.acquire()
+    assert clock.sleeps == [0.5]
+    clock.now += 0.25
+    limiter.acquire()
+    assert clock.sleeps == [0.5, 0.25]
+
+    # A quiet period refills the bucket up to the burst, not beyond it
+    clock.now += 10
+    limiter.acquire()
+    limiter.acquire()
+    limiter.acquire()
+    assert clock.sleeps == [0.5, 0.25, 0.5]
+
+
+def test_rate_limiter_disabled(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(bulk, "time", clock)
+    limiter = RateLimiter(rate=0)
+    for _ in range(100):
+        limiter.acquire()
+    assert clock.sleeps == []
@@ -0,0 +1,152 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import circuit_breaker
+from circuit_breaker import CallReport, CircuitBreaker
+
+
+def test_deadline_misses_open_the_breaker_and_late_outcomes_are_ignored():
+    breaker = CircuitBreaker(failure_rate=0.5, min_calls=2, slow_call_seconds=30)
+
+    for _ in range(2):
+        report = CallReport(breaker)
+        report.deadline_missed()
+        # The abandoned call finishes later, well under slow_call_seconds
+        report.success(1.5)
+
+    snapshot = breaker.snapshot()
+    assert snapshot['state'] == CircuitBreaker.OPEN
+    assert snapshot['deadline_misses'] == 2
+    assert snapshot['successes'] == 0
+    assert not breaker.allow_request()
+
+
+def test_call_report_records_only_the_first_outcome():
+    breaker = CircuitBreaker(min_calls=10)
+    report = CallReport(breaker)
+    report.success(0.1)
+    report.failure()
+    report.deadline_missed()
+
+    snapshot = breaker.snapshot()
+    assert (snapshot['successes'], snapshot['failures'], snapshot['deadline_misses']) == (1, 0, 0)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", fake)
+    return fake
+
+
+def test_stays_closed_until_min_calls(clock):
+    breaker = CircuitBreaker(failure_rate=0.5, min_calls=3)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.trips == 1
+
+
+def test_opens_at_the_failure_rate(clock):
+    breaker = CircuitBreaker(failure_rate=0.5, min_calls=4)
+    for _ in range(3):
+        breaker.record_success(0.1)
+    breaker.record_failure()
+    # 1 of 4 bad
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    # 2 of 5 bad
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    # 3 of 6 bad
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_slow_calls_count_as_bad(clock):
+    breaker = CircuitBreaker(failure_rate=0.5, min_calls=2, slow_call_seconds=1)
+    breaker.record_success(2)
+    breaker.record_success(2)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.snapshot()['slow_calls'] == 2
+
+
+def test_old_calls_leave_the_window(clock):
+    breaker = CircuitBreaker(failure_rate=0.5, min_calls=2, window_seconds=60)
+    breaker.record_failure()
+    clock.now += 61
+    breaker.record_success(0.1)
+    breaker.record_success(0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.snapshot()['recent_calls'] == 2
+
+
+def open_breaker(half_open_probes=1):
+    breaker = CircuitBreaker(min_calls=1, open_seconds=30, half_open_probes=half_open_probes)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    return breaker
+
+
+def test_open_rejects_until_open_seconds_pass(clock):
+    breaker = open_breaker()
+    clock.now += 29
+    assert not breaker.allow_request()
+    assert breaker.rejected == 1
+    clock.now += 1
+    assert breaker.snapshot()['state'] == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_successful_probe_closes(clock):
+    breaker = open_breaker()
+    clock.now += 30
+    assert breaker.allow_request()
+    # Only one probe at a time
+    assert not breaker.allow_request()
+    breaker.record_success(0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = open_breaker()
+    clock.now += 30
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.trips == 2
+    assert not breaker.allow_request()
+
+
+def test_lost_probe_is_replaced_after_open_seconds(clock):
+    breaker = open_breaker()
+    clock.now += 30
+    assert breaker.allow_request()
+    # The probe never reports back
+    clock.now += 29
+    assert not breaker.allow_request()
+    clock.now += 1
+    assert breaker.allow_request()
+    breaker.record_success(0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_calls_finishing_while_open_are_ignored(clock):
+    breaker = open_breaker()
+    breaker.record_success(0.1)
+    assert breaker.state == CircuitBreaker.OPEN
@@ -0,0 +1,120 @@
+import os
+import re
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import pytest
+
+from bench_fallback import generate_cases, scan_themes
+from fallback import build_fallback_response, detect_themes
+from fallback_data import EXERCISES, GENERAL_EXERCISES, NO_THEME_EXERCISES
+from harness import load_corpus
+
+CORPUS = load_corpus()
+
+OVERLAP_CASES = [
+    "",
+    "HOPEFUL and STARTLED",
+    "workout",  # "work" (theme) inside "workout" (interest)
+    "startled",  # "art" inside another word
+    "daydream",  # "dream" is both a sleep and a future planning keyword
+    "gratefulness",  # "grateful" is both happiness and gratitude
+    "worry about",
+    "worryabout",
+    "notsure not sure",
+    "I don’t know, I don't know",
+    "sadness",
+    "frustratedannoyed",
+    "runrunrun",
+    "plantsplan",
+]
+
+
+def exercise(prefix):
+    # An exercise text from the tables by its opening words
+    texts = [text for _, text in EXERCISES + NO_THEME_EXERCISES] + GENERAL_EXERCISES
+    matches = [text for text in texts if text.startswith(prefix)]
+    assert len(matches) == 1, prefix
+    return matches[0]
+
+
+def old_exercises(journal_entry):
+    # The exercise selection that submit() used before fallback.py, as it was
+    themes, interests, emotions = scan_themes(journal_entry)
+    frustration, hope, confusion, gratitude = (
+        name in emotions for name in ("frustration", "hope", "confusion", "gratitude")
+    )
+    personalized_exercises = []
+    if "work" in themes:
+        if frustration:
+            personalized_exercises.append(exercise("Try the 'Three Good Things at Work'"))
+        if "stress" in themes:
+            personalized_exercises.append(exercise("Practice the '90-second pause'"))
+        personalized_exercises.append(exercise("Create a 'work containment ritual'"))
+    if "relationships" in themes:
+        if "sadness" in themes:
+            personalized_exercises.append(exercise("Write a 'connection letter'"))
+        personalized_exercises.append(exercise("Practice 'active listening plus'"))
+    if "sleep" in themes:
+        personalized_exercises.append(exercise("Try the '4-7-8 breathing technique'"))
+        personalized_exercises.append(exercise("Create a 'worry drop' ritual"))
+    if "health" in themes:
+        personalized_exercises.append(exercise("Practice a 3-minute body appreciation scan"))
+        if "stress" in themes:
+            personalized_exercises.append(exercise("Try 'symptom scheduling'"))
+    if "future planning" in themes:
+        if confusion:
+            personalized_exercises.append(exercise("Use the 'Values Compass'"))
+        if hope:
+            personalized_exercises.append(exercise("Create a 'possibility portfolio'"))
+    if "creative expression" in interests:
+        personalized_exercises.append(exercise("Try 'emotional color mapping'"))
+    if "nature" in interests:
+        personalized_exercises.append(exercise("Practice 'sensory nature immersion'"))
+    if "physical activity" in interests and "stress" in themes:
+        personalized_exercises.append(exercise("Incorporate 'micro-movements'"))
+    if "mindfulness" in interests:
+        if confusion:
+            personalized_exercises.append(exercise("Practice the 'RAIN' technique"))
+    if not themes:
+        if frustration:
+            personalized_exercises.append(exercise("Try the 'alternative perspectives'"))
+        if gratitude:
+            personalized_exercises.append(exercise("Practice 'specific gratitude'"))
+        personalized_exercises.append(exercise("Experiment with a 'values-based decision filter'"))
+    while len(personalized_exercises) < 3:
+        for text in GENERAL_EXERCISES:
+            if text not in personalized_exercises:
+                personalized_exercises.append(text)
+                if len(personalized_exercises) >= 3:
+                    break
+    return personalized_exercises[:3]
+
+
+def response_exercises(response):
+    return re.findall(r"<p>\d\. (.*?)</p>", response, re.S)
+
+
+@pytest.mark.parametrize("entry", CORPUS + OVERLAP_CASES)
+def test_detect_themes_matches_the_per_keyword_scan(entry):
+    assert detect_themes(entry) == scan_themes(entry)
+
+
+def test_detect_themes_matches_on_generated_entries():
+    mismatches = [case for case in generate_cases([], 5000, seed=0) if detect_themes(case) != scan_themes(case)]
+    assert mismatches == []
+
+
+@pytest.mark.parametrize("entry", CORPUS + OVERLAP_CASES)
+def test_fallback_response_picks_the_old_exercises(entry):
+    response = build_fallback_response(entry, "neutral")
+    assert response_exercises(response) == old_exercises(entry)
+    assert "experiencing some neutral emotions" in response
+
+
+def test_fallback_response_picks_the_old_exercises_on_generated_entries():
+    for case in generate_cases([], 2000, seed=1):
+        assert response_exercises(build_fallback_response(case, "positive")) == old_exercises(case), case
@@ -0,0 +1,84 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from result_cache import ResultCache
+
+
+def test_cancelled_leader_hands_the_key_to_a_follower():
+    async def scenario():
+        cache = ResultCache()
+        started = asyncio.Event()
+        calls = []
+
+        async def slow():
+            calls.append("leader")
+            started.set()
+            await asyncio.sleep(10)
+
+        async def fast():
+            calls.append("follower")
+            return "value"
+
+        leader = asyncio.create_task(cache.get_or_compute_async("k", slow))
+        await started.wait()
+        follower = asyncio.create_task(cache.get_or_compute_async("k", fast))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await asyncio.wait_for(follower, 2) == "value"
+        assert leader.cancelled()
+        assert calls == ["leader", "follower"]
+        assert cache.get("k") == "value"
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_follower_does_not_affect_the_others():
+    async def scenario():
+        cache = ResultCache()
+        release = asyncio.Event()
+
+        async def compute():
+            await release.wait()
+            return "value"
+
+        leader = asyncio.create_task(cache.get_or_compute_async("k", compute))
+        await asyncio.sleep(0)
+        first = asyncio.create_task(cache.get_or_compute_async("k", compute))
+        second = asyncio.create_task(cache.get_or_compute_async("k", compute))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        assert await asyncio.wait_for(leader, 2) == "value"
+        assert await asyncio.wait_for(second, 2) == "value"
+        assert first.cancelled()
+
+    asyncio.run(scenario())
+
+
+def test_errors_reach_waiting_callers():
+    async def scenario():
+        cache = ResultCache()
+        release = asyncio.Event()
+
+        async def failing():
+            await release.wait()
+            raise ValueError("boom")
+
+        leader = asyncio.create_task(cache.get_or_compute_async("k", failing))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(cache.get_or_compute_async("k", failing))
+        await asyncio.sleep(0)
+        release.set()
+
+        for task in (leader, follower):
+            with pytest.raises(ValueError):
+                await task
+
+    asyncio.run(scenario())